@@ -3,9 +3,19 @@ import pandas as pd
 import numpy as np
 import os
 import math
+import tempfile
+import uuid
+import weakref
 from preprocessing import Preprocessor
-from word_embedding import WordEmbedding
+from word_embedding import WordEmbedding, convert_tokenizer
 from model_builder import ModelBuilder
+from model_registry import ModelRegistry
+from instrumentation import profiler
+from stream_classifier import iter_text_chunks, classify_stream
+from artifact_cache import array_hash, file_hash, hash_key, load_arrays, save_arrays
+from tflite_export import tflite_path
+from lexicon import build_lexicon, lexicon_is_current
+from training import TRAINING_RUNS_DIR, find_metrics_table, load_metrics_table
 
 # ==========================================
 # 1. KONFIGURASI HALAMAN & VARIABEL GLOBAL
@@ -17,8 +27,22 @@ st.set_page_config(
 )
 
 TOKENIZER_PATH = 'tokenizer.json'
+TOKENIZER_SLIM_PATH = 'tokenizer.npz'
 MODEL_DIR = '.' 
 VALIDATION_DATA_MENTAH = 'data_validasi_mentah.csv' 
+STEM_CACHE_PATH = 'stem_cache.json'
+KAMUS_SLANG_PATH = 'kamus_slang.json'
+LEXICON_PATH = 'lexicon.bin'
+PREPROCESS_WORKERS = os.cpu_count() or 1
+MAX_RESIDENT_MODELS = 4
+UPLOAD_CHUNK_ROWS = 20000
+MAX_PREVIEW_ROWS = 10000
+MODEL_MEMORY_BUDGET_MB = 256
+# 'keras' (default), 'float16' atau 'int8': pakai hasil ekspor tflite_export.py jika file .tflite-nya ada
+MODEL_BACKEND = os.environ.get('JUDOL_MODEL_BACKEND', 'keras')
+TFLITE_THREADS = os.cpu_count() or 1
+# Skenario peringkat 1-3, dipakai sebagai pilihan awal perbandingan ensemble
+ENSEMBLE_DEFAULT = ["model 6.h5", "model 5.h5", "model 2.h5"]
 
 DATA_SKENARIO = {
     "model 1.h5":  {"lr": "0.001", "bs": 32, "epoch": 5},
@@ -94,31 +118,154 @@ def inject_custom_css():
 # ==========================================
 # 3. FUNGSI HELPER
 # ==========================================
-def determine_category(row):
-    actual = row['label']
-    pred = row['prediksi_biner']
-    if actual == 1 and pred == 1: return "TP (True Positive)"
-    elif actual == 0 and pred == 0: return "TN (True Negative)"
-    elif actual == 0 and pred == 1: return "FP (False Positive)"
-    elif actual == 1 and pred == 0: return "FN (False Negative)"
-    return "Unknown"
+def determine_categories(labels, preds):
+    labels = np.asarray(labels)
+    preds = np.asarray(preds)
+    return np.select(
+        [
+            (labels == 1) & (preds == 1),
+            (labels == 0) & (preds == 0),
+            (labels == 0) & (preds == 1),
+            (labels == 1) & (preds == 0),
+        ],
+        ["TP (True Positive)", "TN (True Negative)", "FP (False Positive)", "FN (False Negative)"],
+        default="Unknown"
+    )
+
+def build_validation_results(df_processed, scores):
+    scores = np.asarray(scores, dtype=float)
+    preds = (scores >= 0.5).astype(int)
+    df_results = df_processed.copy()
+    df_results['skor_prediksi'] = scores
+    df_results['prediksi_biner'] = preds
+    df_results['klasifikasi'] = np.where(preds == 1, "Judi Online", "Non-Judi Online")
+    if 'label' in df_results.columns:
+        df_results['kategori_evaluasi'] = determine_categories(df_results['label'].to_numpy(), preds)
+    return df_results
+
+def score_validation(model_builder, model_path, sequences):
+    # Skor validasi disimpan per (hash file model, hash data validasi) sehingga
+    # mengaktifkan ulang skenario yang sama tidak menjalankan inferensi lagi
+    key = hash_key(file_hash(model_path), array_hash(sequences))
+    cached = load_arrays('skor_validasi', key)
+    if cached is not None and len(cached['scores']) == len(sequences):
+        return cached['scores']
+    try:
+        scores = np.asarray(model_builder.score_sequences(sequences), dtype=np.float32)
+    except Exception as e:
+        # Skor gagal tidak disimpan ke cache, agar percobaan berikutnya menjalankan inferensi lagi
+        print(f"ERROR: Gagal menilai data validasi dengan {model_path}: {e}")
+        return None
+    save_arrays('skor_validasi', key, scores=scores)
+    return scores
+
+def evaluation_metrics(labels, scores):
+    labels = np.asarray(labels).astype(int)
+    preds = (np.asarray(scores) >= 0.5).astype(int)
+    tp = int(((labels == 1) & (preds == 1)).sum())
+    fp = int(((labels == 0) & (preds == 1)).sum())
+    fn = int(((labels == 1) & (preds == 0)).sum())
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return {
+        'Akurasi': float((labels == preds).mean()) if len(labels) else 0.0,
+        'Precision': precision,
+        'Recall': recall,
+        'F1-Score': 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+    }
+
+def compare_models(model_builder, filenames, sequences, labels):
+    # Semua skenario menilai sequence validasi yang sama dalam satu panggilan ensemble
+    # (encoding sekali, model berjalan bersamaan); skor tiap model ikut disimpan ke cache skor validasi
+    paths = [resolve_model_path(filename) for filename in filenames]
+    if not model_builder.load_ensemble(paths):
+        return None
+    try:
+        scores, combined = model_builder.classify_ensemble_sequences(sequences)
+    except Exception as e:
+        print(f"ERROR: Gagal menilai data validasi dengan ensemble: {e}")
+        return None
+    sequences_hash = array_hash(sequences)
+    rows = []
+    for filename, path in zip(filenames, paths):
+        save_arrays('skor_validasi', hash_key(file_hash(path), sequences_hash), scores=scores[path])
+        rows.append(dict({'Model': filename}, **evaluation_metrics(labels, scores[path])))
+    rows.append(dict({'Model': "Ensemble (rata-rata)"}, **evaluation_metrics(labels, combined)))
+    return pd.DataFrame(rows)
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+class TempResultFile:
+    # File hasil klasifikasi sementara milik satu sesi. Dihapus saat diganti hasil baru, saat objek ini
+    # dibuang bersama session_state (sesi berakhir), atau paling lambat saat proses Streamlit berhenti
+    def __init__(self, path):
+        self.path = path
+        self._finalizer = weakref.finalize(self, _remove_file, path)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def read_bytes(self):
+        # Dipanggil Streamlit hanya saat tombol download diklik (data deferred), bukan di setiap rerun
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def remove(self):
+        self._finalizer()
+
+def resolve_model_path(filename):
+    model_path = os.path.join(MODEL_DIR, filename)
+    if MODEL_BACKEND != 'keras':
+        exported_path = tflite_path(model_path, MODEL_BACKEND)
+        if os.path.exists(exported_path):
+            return exported_path
+        print(f"File {exported_path} tidak ditemukan, memakai model Keras {model_path}")
+    return model_path
+
+@st.cache_data
+def load_training_metrics(metrics_path, mtime):
+    # mtime ikut menjadi kunci cache agar tabel hasil training ulang langsung terbaca
+    return load_metrics_table(metrics_path)
 
 @st.cache_resource
 def load_preprocessor():
-    return Preprocessor()
+    # lexicon.bin (kamus slang + stopword + cache stemming) dibangun ulang jika belum ada atau digest
+    # sumbernya tidak cocok; jika gagal (mis. korpus NLTK tidak ada), Preprocessor memakai file JSON.
+    # Lexicon divalidasi sekali di sini (cache_resource: sekali per proses), bukan lagi di Preprocessor
+    lexicon_ok = lexicon_is_current(LEXICON_PATH, KAMUS_SLANG_PATH)
+    if not lexicon_ok:
+        try:
+            build_lexicon(LEXICON_PATH, KAMUS_SLANG_PATH, STEM_CACHE_PATH)
+            lexicon_ok = True
+        except Exception as e:
+            print(f"ERROR: Gagal membangun {LEXICON_PATH}: {e}")
+    return Preprocessor(
+        stem_cache_path=STEM_CACHE_PATH, lexicon_path=LEXICON_PATH if lexicon_ok else '', verify_lexicon=False
+    )
 
 @st.cache_resource
-def load_word_embedding(tokenizer_path):
+def load_word_embedding(tokenizer_path, tokenizer_slim_path):
     we = WordEmbedding()
     try:
-        we.load_tokenizer(tokenizer_path)
+        # Format ringkas (.npz) dibuat ulang dari tokenizer.json jika belum ada atau sudah usang
+        if not os.path.exists(tokenizer_slim_path) or os.path.getmtime(tokenizer_slim_path) < os.path.getmtime(tokenizer_path):
+            convert_tokenizer(tokenizer_path, tokenizer_slim_path)
+        we.load_tokenizer(tokenizer_slim_path)
     except Exception as e:
         st.error(f"FATAL: Gagal memuat {tokenizer_path}. Error: {e}")
         st.stop()
     return we
 
 @st.cache_resource
-def load_and_process_validation_data(_preprocessor, filepath, _progress_bar, _status_text):
+def load_model_registry():
+    return ModelRegistry(max_models=MAX_RESIDENT_MODELS, memory_budget_mb=MODEL_MEMORY_BUDGET_MB)
+
+@st.cache_resource
+def load_and_process_validation_data(_preprocessor, _word_embedding, filepath, _progress_bar, _status_text):
     try:
         df_raw = pd.read_csv(filepath)
     except FileNotFoundError:
@@ -127,36 +274,65 @@ def load_and_process_validation_data(_preprocessor, filepath, _progress_bar, _st
     if 'text' not in df_raw.columns:
         st.error(f"FATAL: File `{filepath}` tidak memiliki kolom 'text'.")
         st.stop()
-        
-    total = len(df_raw)
-    processed_texts = []
-    for i, text in enumerate(df_raw['text']):
-        progress_percent = (i + 1) / total
-        _progress_bar.progress(progress_percent)
-        _status_text.text(f"Memproses data validasi: {i + 1}/{total} baris...")
-        processed_texts.append(" ".join(_preprocessor.preprocess_text(text)))
-        
-    df_processed = df_raw.copy()
-    df_processed['processed_text'] = processed_texts
-    return df_processed
-
-def process_dataframe(df_raw, preprocessor):
-    processed_texts = []
-    progress_bar = st.progress(0, text="Memproses file (Sastrawi)...")
-    total = len(df_raw)
-    for i, text in enumerate(df_raw['text']):
-        processed_texts.append(" ".join(preprocessor.preprocess_text(text)))
-        progress_bar.progress((i + 1) / total, text=f"Memproses baris {i+1}/{total}")
-    progress_bar.empty()
+
+    # Artefak hasil preprocessing disimpan ke disk dengan kunci hash isi CSV, kamus slang,
+    # stopword dan versi preprocessing, sehingga hanya dihitung ulang jika ada yang berubah
+    text_key = hash_key(file_hash(filepath), _preprocessor.fingerprint())
+    seq_key = hash_key(text_key, _word_embedding.fingerprint())
+
+    cached = load_arrays('validasi_text', text_key)
+    if cached is not None and len(cached['processed_text']) == len(df_raw):
+        processed_texts = cached['processed_text'].tolist()
+    else:
+        def update_progress(done, total):
+            _progress_bar.progress(done / total)
+            _status_text.text(f"Memproses data validasi: {done}/{total} baris...")
+
+        processed_tokens = _preprocessor.preprocess_batch(
+            df_raw['text'], workers=PREPROCESS_WORKERS, progress_callback=update_progress
+        )
+        processed_texts = [" ".join(tokens) for tokens in processed_tokens]
+        _preprocessor.save_stem_cache()
+        save_arrays('validasi_text', text_key, processed_text=np.array(processed_texts, dtype=str))
+
+    cached = load_arrays('validasi_seq', seq_key)
+    if cached is not None and len(cached['sequences']) == len(df_raw):
+        sequences = cached['sequences']
+    else:
+        sequences = _word_embedding.get_sequences(processed_texts).astype(np.int32)
+        save_arrays('validasi_seq', seq_key, sequences=sequences)
+
     df_processed = df_raw.copy()
     df_processed['processed_text'] = processed_texts
-    return df_processed
+    return df_processed, sequences
+
+def build_category_index(df_results):
+    # Posisi baris per kategori evaluasi (dihitung sekali per DataFrame hasil)
+    if 'kategori_evaluasi' not in df_results.columns:
+        return {}
+    codes, categories = pd.factorize(df_results['kategori_evaluasi'])
+    return {category: np.flatnonzero(codes == i) for i, category in enumerate(categories)}
+
+def get_result_view(df_results, state_key, selected_filters):
+    # Indeks kategori & hasil filter disimpan di session_state dan hanya dibangun ulang jika
+    # DataFrame hasilnya berganti, sehingga rerun (klik halaman/filter) tidak memproses seluruh data
+    view_key = f"{state_key}_view"
+    view = st.session_state.get(view_key)
+    if view is None or view['source'] is not df_results:
+        view = {'source': df_results, 'index': build_category_index(df_results), 'selections': {}}
+        st.session_state[view_key] = view
+    if not selected_filters:
+        return None
+    filter_key = tuple(sorted(selected_filters))
+    if filter_key not in view['selections']:
+        parts = [view['index'][f] for f in filter_key if f in view['index']]
+        view['selections'][filter_key] = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+    return view['selections'][filter_key]
 
 def show_paginated_results(df_results, state_key):
     st.subheader("📊 Hasil Klasifikasi")
     
-    df_display_final = df_results.copy()
-    
+    selected_filters = []
     if 'kategori_evaluasi' in df_results.columns:
         col_filter, col_item = st.columns([3, 1])
         with col_filter:
@@ -168,10 +344,6 @@ def show_paginated_results(df_results, state_key):
                 key=f"{state_key}_filter",
                 on_change=lambda: st.session_state.update({f"{state_key}_page": 1})
             )
-            if selected_filters:
-                df_display_final = df_results[df_results['kategori_evaluasi'].isin(selected_filters)]
-            else:
-                df_display_final = df_results
         with col_item:
             items_per_page = st.selectbox("Item per Halaman", (10, 20, 50, 100), key=f"{state_key}_items", on_change=lambda: st.session_state.update({f"{state_key}_page": 1}))
     else:
@@ -179,7 +351,9 @@ def show_paginated_results(df_results, state_key):
         with col_item:
             items_per_page = st.selectbox("Item per Halaman", (10, 20, 50, 100), key=f"{state_key}_items", on_change=lambda: st.session_state.update({f"{state_key}_page": 1}))
 
-    total_items = len(df_display_final)
+    # selection = posisi baris yang lolos filter (None = semua baris)
+    selection = get_result_view(df_results, state_key, selected_filters)
+    total_items = len(df_results) if selection is None else len(selection)
     total_pages = max(1, math.ceil(total_items / items_per_page))
     st.caption(f"Menampilkan {total_items} data.")
 
@@ -193,16 +367,20 @@ def show_paginated_results(df_results, state_key):
     start_idx = (current_page - 1) * items_per_page
     end_idx = start_idx + items_per_page
     
-    df_page_view = df_display_final.iloc[start_idx:end_idx].copy()
-    df_page_view.insert(0, 'No.', range(start_idx + 1, start_idx + 1 + len(df_page_view)))
-    df_page_view['skor_prediksi'] = df_page_view['skor_prediksi'].apply(lambda x: f"{x:.4f}")
-    
-    cols_to_show = ['No.', 'text', 'skor_prediksi', 'klasifikasi']
-    if 'kategori_evaluasi' in df_page_view.columns:
+    cols_to_show = ['text', 'skor_prediksi', 'klasifikasi']
+    if 'kategori_evaluasi' in df_results.columns:
         cols_to_show.append('kategori_evaluasi')
+
+    # Hanya baris di halaman aktif yang disalin dan diformat
+    if selection is None:
+        df_page_view = df_results.iloc[start_idx:end_idx][cols_to_show].copy()
+    else:
+        df_page_view = df_results.iloc[selection[start_idx:end_idx]][cols_to_show].copy()
+    df_page_view.insert(0, 'No.', range(start_idx + 1, start_idx + 1 + len(df_page_view)))
+    df_page_view['skor_prediksi'] = [f"{x:.4f}" for x in df_page_view['skor_prediksi'].to_numpy()]
         
     st.dataframe(
-        df_page_view[cols_to_show],
+        df_page_view,
         use_container_width=True,
         hide_index=True
     )
@@ -235,18 +413,55 @@ def show_paginated_results(df_results, state_key):
                     use_container_width=True
                 )
 
+def show_diagnostics_panel():
+    with st.sidebar:
+        st.markdown("### ⏱️ Diagnostik Performa")
+        enabled = st.toggle("Aktifkan profiling per tahap", value=profiler.enabled, key="profiling_enabled")
+        if enabled != profiler.enabled:
+            profiler.enable() if enabled else profiler.disable()
+
+        snapshot = profiler.snapshot()
+        if snapshot:
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        'Tahap': name,
+                        'Panggilan': stat['calls'],
+                        'Item': stat['items'],
+                        'Total (s)': round(stat['total_s'], 4),
+                        'Rata-rata (ms)': round(stat['mean_ms'], 3),
+                        'Maks (ms)': round(stat['max_s'] * 1000, 3),
+                    }
+                    for name, stat in sorted(snapshot.items(), key=lambda kv: -kv[1]['total_s'])
+                ]),
+                use_container_width=True,
+                hide_index=True
+            )
+            st.download_button("⬇️ JSON", data=profiler.to_json(), file_name="profil_tahap.json", mime="application/json")
+            st.download_button("⬇️ Prometheus", data=profiler.to_prometheus(), file_name="profil_tahap.prom", mime="text/plain")
+            if st.button("Reset Profil"):
+                profiler.reset()
+                st.rerun()
+        else:
+            st.caption("Belum ada data. Aktifkan profiling lalu jalankan klasifikasi.")
+        st.caption("Catatan: preprocessing di worker multi-proses tidak tercatat.")
+
 # ==========================================
 # 4. MAIN PROGRAM
 # ==========================================
 def main():
     inject_custom_css()
+    show_diagnostics_panel()
     
     with st.spinner("Menyiapkan sistem..."):
         preprocessor = load_preprocessor()
-        word_embedding = load_word_embedding(TOKENIZER_PATH)
+        word_embedding = load_word_embedding(TOKENIZER_PATH, TOKENIZER_SLIM_PATH)
+        model_registry = load_model_registry()
     
     if 'model_builder' not in st.session_state:
-        st.session_state.model_builder = ModelBuilder(preprocessor, word_embedding)
+        st.session_state.model_builder = ModelBuilder(
+            preprocessor, word_embedding, registry=model_registry, tflite_threads=TFLITE_THREADS
+        )
     if 'active_model_name' not in st.session_state:
         st.session_state.active_model_name = None
     if 'validation_results' not in st.session_state:
@@ -263,13 +478,15 @@ def main():
             progress_bar = st.progress(0)
             status_text = st.empty()
             
-            df_processed = load_and_process_validation_data(
+            df_processed, sequences = load_and_process_validation_data(
                 _preprocessor=preprocessor, 
+                _word_embedding=word_embedding,
                 filepath=VALIDATION_DATA_MENTAH, 
                 _progress_bar=progress_bar, 
                 _status_text=status_text
             )
             st.session_state.df_validasi_processed = df_processed
+            st.session_state.validation_sequences = sequences
         loading_container.empty()
         st.rerun()
 
@@ -324,30 +541,55 @@ def main():
                 
                 if st.button("🚀 Muat & Aktifkan Model", type="primary", use_container_width=True):
                     with st.spinner(f"Sedang memuat {target_filename}..."):
-                        success = st.session_state.model_builder.load_model(
-                            os.path.join(MODEL_DIR, target_filename)
-                        )
+                        target_path = resolve_model_path(target_filename)
+                        success = st.session_state.model_builder.load_model(target_path)
                         
                         if success:
                             st.session_state.active_model_name = target_filename
-                            scores = st.session_state.model_builder.classify_batch(
-                                df_validasi_processed['processed_text']
+                            scores = score_validation(
+                                st.session_state.model_builder,
+                                target_path,
+                                st.session_state.validation_sequences
                             )
-                            df_results = df_validasi_processed.copy()
-                            df_results['skor_prediksi'] = scores
-                            df_results['prediksi_biner'] = [1 if s >= 0.5 else 0 for s in scores]
-                            df_results['klasifikasi'] = [
-                                "Judi Online" if s == 1 else "Non-Judi Online" for s in df_results['prediksi_biner']
-                            ]
-                            if 'label' in df_results.columns:
-                                df_results['kategori_evaluasi'] = df_results.apply(determine_category, axis=1)
-
-                            st.session_state.validation_results = df_results
-                            st.session_state.show_table = True 
-                            st.rerun()
+                            if scores is None:
+                                st.error(f"Gagal menilai data validasi dengan {target_filename}")
+                            else:
+                                df_results = build_validation_results(df_validasi_processed, scores)
+
+                                st.session_state.validation_results = df_results
+                                st.session_state.show_table = True
+                                st.rerun()
                         else:
                             st.error(f"Gagal memuat file: {target_filename}")
 
+                with st.expander("⚖️ Bandingkan Skenario (Ensemble)"):
+                    compare_filenames = st.multiselect(
+                        "Skenario yang dibandingkan:",
+                        options=list(DATA_SKENARIO),
+                        default=ENSEMBLE_DEFAULT
+                    )
+                    if st.button("Bandingkan pada Data Validasi", use_container_width=True, disabled=not compare_filenames):
+                        if 'label' not in df_validasi_processed.columns:
+                            st.error("Data validasi tidak memiliki kolom 'label'.")
+                        else:
+                            with st.spinner(f"Menilai {len(compare_filenames)} model sekaligus..."):
+                                st.session_state.ensemble_comparison = compare_models(
+                                    st.session_state.model_builder,
+                                    compare_filenames,
+                                    st.session_state.validation_sequences,
+                                    df_validasi_processed['label'].to_numpy()
+                                )
+                            if st.session_state.ensemble_comparison is None:
+                                st.error("Gagal memuat atau menilai salah satu model yang dipilih.")
+                    if st.session_state.get('ensemble_comparison') is not None:
+                        st.dataframe(
+                            st.session_state.ensemble_comparison.style.format(
+                                {'Akurasi': '{:.4f}', 'Precision': '{:.4f}', 'Recall': '{:.4f}', 'F1-Score': '{:.4f}'}
+                            ),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+
         with col_kanan:
             with st.container(border=True):
                 st.markdown("### Status Model")
@@ -398,6 +640,44 @@ def main():
                     with m1: st.metric("L.Rate", current_conf.get('lr', '-'))
                     with m2: st.metric("Batch", current_conf.get('bs', '-'))
                     with m3: st.metric("Epoch", current_conf.get('epoch', '-'))
+
+                    # Metrik data test dari training.py: di samping checkpoint aktif, atau dari run terbaru
+                    metrics_path = find_metrics_table(MODEL_DIR, os.path.join(MODEL_DIR, TRAINING_RUNS_DIR))
+                    if metrics_path is not None:
+                        df_metrics = load_training_metrics(metrics_path, os.path.getmtime(metrics_path))
+                        if df_metrics is not None and 'Skenario' in df_metrics.columns:
+                            row = df_metrics[df_metrics['Skenario'] == active_name]
+                            if len(row):
+                                row = row.iloc[0]
+                                m4, m5, m6 = st.columns(3)
+                                with m4: st.metric("Akurasi (Test)", f"{row['Accuracy']:.4f}")
+                                with m5: st.metric("F1-Score", f"{row['F1-Score']:.4f}")
+                                with m6: st.metric("Waktu Latih", f"{row['Waktu Latih (s)']:.0f} s")
+                                st.caption(f"Sumber metrik: {metrics_path}")
+
+                    registry_stats = model_registry.stats()
+                    with st.expander(f"Model di memori: {registry_stats['resident']}/{registry_stats['max_models']} ({registry_stats['resident_mb']:.1f} MB)"):
+                        st.dataframe(
+                            pd.DataFrame([
+                                {
+                                    'Model': os.path.basename(m['path']),
+                                    'Ukuran (MB)': round(m['size_mb'], 1),
+                                    'Waktu Muat (s)': round(m['load_time_s'], 2),
+                                    'Dipakai Ulang': m['hits'],
+                                }
+                                for m in registry_stats['models']
+                            ]),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+                        st.caption(f"Hit: {registry_stats['hits']} | Miss: {registry_stats['misses']} | Eviction: {registry_stats['evictions']}")
+
+                    score_cache = st.session_state.model_builder.score_cache_info()
+                    st.caption(
+                        f"Cache skor komentar: {score_cache['size']}/{score_cache['maxsize']} | "
+                        f"Hit rate: {score_cache['hit_rate'] * 100:.1f}% "
+                        f"({score_cache['hits']} hit, {score_cache['misses']} miss)"
+                    )
                 else:
                     st.markdown(
                         """
@@ -450,23 +730,72 @@ def main():
                     if uploaded_file_new:
                         if st.button("📂 Check File", type="primary", use_container_width=True):
                             try:
-                                if uploaded_file_new.name.endswith('.csv'):
-                                    df_new_raw = pd.read_csv(uploaded_file_new)
-                                else:
-                                    lines = uploaded_file_new.getvalue().decode('utf-8').splitlines()
-                                    df_new_raw = pd.DataFrame(lines, columns=['text'])
-                                
-                                df_new_processed = process_dataframe(df_new_raw, preprocessor)
-                                scores_new = st.session_state.model_builder.classify_batch(df_new_processed['processed_text'])
-                                df_results_new = df_new_processed.copy()
-                                df_results_new['skor_prediksi'] = scores_new
-                                df_results_new['klasifikasi'] = ["Judi Online" if s >= 0.5 else "Non-Judi Online" for s in scores_new]
-                                st.session_state.df_file_processed = df_results_new
+                                # Hapus file hasil sebelumnya agar folder temp tidak menumpuk
+                                old_result = st.session_state.get('file_result')
+                                if old_result is not None:
+                                    old_result.remove()
+                                st.session_state.file_result = None
+
+                                output_path = os.path.join(tempfile.gettempdir(), f"hasil_klasifikasi_{uuid.uuid4().hex}.csv")
+                                # Didaftarkan sebelum diproses agar file setengah jadi (jika gagal) ikut dihapus
+                                result_file = TempResultFile(output_path)
+                                uploaded_file_new.seek(0)
+                                chunks = iter_text_chunks(uploaded_file_new, uploaded_file_new.name, chunk_rows=UPLOAD_CHUNK_ROWS)
+
+                                progress_bar = st.progress(0, text="Memproses file (Sastrawi)...")
+                                live_preview = st.empty()
+                                preview_frames = []
+                                preview_rows = 0
+                                n_judi = 0
+                                rows_done = 0
+                                for df_chunk, rows_done in classify_stream(
+                                    chunks, preprocessor, st.session_state.model_builder, output_path, workers=PREPROCESS_WORKERS
+                                ):
+                                    n_judi += int((df_chunk['skor_prediksi'] >= 0.5).sum())
+                                    # Hanya MAX_PREVIEW_ROWS baris pertama yang disimpan di memori untuk ditampilkan
+                                    if preview_rows < MAX_PREVIEW_ROWS:
+                                        df_take = df_chunk.iloc[:MAX_PREVIEW_ROWS - preview_rows]
+                                        preview_frames.append(df_take)
+                                        preview_rows += len(df_take)
+                                    file_progress = min(1.0, uploaded_file_new.tell() / max(1, uploaded_file_new.size))
+                                    progress_bar.progress(
+                                        file_progress,
+                                        text=f"Diproses {rows_done} baris | Judi Online: {n_judi} | Non-Judi: {rows_done - n_judi}"
+                                    )
+                                    live_preview.dataframe(
+                                        df_chunk[['text', 'skor_prediksi', 'klasifikasi']].tail(5),
+                                        use_container_width=True,
+                                        hide_index=True
+                                    )
+                                progress_bar.empty()
+                                live_preview.empty()
+
+                                st.session_state.df_file_processed = (
+                                    pd.concat(preview_frames, ignore_index=True) if preview_frames
+                                    else pd.DataFrame(columns=['text', 'processed_text', 'skor_prediksi', 'klasifikasi'])
+                                )
+                                st.session_state.file_result = result_file
+                                st.session_state.file_result_summary = {'total': rows_done, 'judi': n_judi}
                             except Exception as e:
                                 st.error(f"Error: {e}")
 
-            if 'df_file_processed' in st.session_state and st.session_state.df_file_processed is not None:
+            if st.session_state.get('file_result') is not None and st.session_state.file_result.exists():
                  st.markdown("---")
+                 summary = st.session_state.file_result_summary
+                 s1, s2, s3 = st.columns(3)
+                 with s1: st.metric("Total Baris", summary['total'])
+                 with s2: st.metric("Judi Online", summary['judi'])
+                 with s3: st.metric("Non-Judi Online", summary['total'] - summary['judi'])
+                 st.download_button(
+                     "⬇️ Download Hasil (.csv)",
+                     data=st.session_state.file_result.read_bytes,
+                     file_name="hasil_klasifikasi.csv",
+                     mime="text/csv"
+                 )
+                 if summary['total'] > len(st.session_state.df_file_processed):
+                     st.caption(f"Tabel di bawah menampilkan {len(st.session_state.df_file_processed)} baris pertama dari {summary['total']} baris. Hasil lengkap tersedia pada file download.")
+
+            if 'df_file_processed' in st.session_state and st.session_state.df_file_processed is not None:
                  show_paginated_results(st.session_state.df_file_processed, state_key='file')
 
 if __name__ == "__main__":
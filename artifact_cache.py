@@ -0,0 +1,59 @@
+import hashlib
+import io
+import os
+import numpy as np
+
+CACHE_DIR = '.cache'
+
+def file_hash(filepath, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def array_hash(array):
+    array = np.ascontiguousarray(array)
+    h = hashlib.sha256()
+    h.update(f"{array.dtype.str}{array.shape}".encode('utf-8'))
+    h.update(array.tobytes())
+    return h.hexdigest()
+
+def hash_key(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()[:16]
+
+def artifact_path(name, key, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{name}_{key}.npz")
+
+def load_arrays(name, key, cache_dir=CACHE_DIR):
+    path = artifact_path(name, key, cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {k: data[k] for k in data.files}
+        print(f"Artefak cache dimuat dari {path}")
+        return arrays
+    except Exception as e:
+        print(f"ERROR: Gagal memuat artefak cache {path}: {e}")
+        return None
+
+def save_arrays(name, key, cache_dir=CACHE_DIR, **arrays):
+    path = artifact_path(name, key, cache_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        # Tulis ke file sementara lalu rename agar artefak tidak pernah terbaca setengah jadi
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+        return path
+    except Exception as e:
+        print(f"ERROR: Gagal menyimpan artefak cache {path}: {e}")
+        return None
@@ -0,0 +1,556 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.realpath(__file__))
+
+# Setiap kasus dijalankan di proses Python baru agar waktu import benar-benar "cold"
+STARTUP_CASES = {
+    'import_preprocessing': "import preprocessing",
+    'import_word_embedding': "import word_embedding",
+    'import_model_builder': "import model_builder",
+    'import_tensorflow': "import tensorflow",
+    # Jalur lama: import TensorFlow + tokenizer_from_json atas tokenizer.json penuh
+    'load_tokenizer_keras_json': (
+        "import json, tensorflow as tf\n"
+        "tf.keras.preprocessing.text.tokenizer_from_json(json.load(open('tokenizer.json', encoding='utf-8')))"
+    ),
+    'load_tokenizer_json': (
+        "from word_embedding import WordEmbedding\n"
+        "WordEmbedding().load_tokenizer('tokenizer.json')"
+    ),
+    'load_tokenizer_slim': (
+        "from word_embedding import WordEmbedding\n"
+        "WordEmbedding().load_tokenizer('tokenizer.npz')"
+    ),
+    # Preprocessor dari kamus_slang.json + korpus NLTK vs dari lexicon.bin (mmap)
+    'init_preprocessor_json': (
+        "from preprocessing import Preprocessor\n"
+        "Preprocessor(lexicon_path='')"
+    ),
+    'init_preprocessor_lexicon': (
+        "from preprocessing import Preprocessor\n"
+        "Preprocessor(lexicon_path='lexicon.bin')"
+    ),
+}
+
+def _time_in_subprocess(code):
+    script = (
+        "import time\n"
+        "_t = time.perf_counter()\n"
+        f"{code}\n"
+        "print('__elapsed__', time.perf_counter() - _t)\n"
+    )
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL='3')
+    output = subprocess.run(
+        [sys.executable, '-c', script], cwd=REPO_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    for line in output.splitlines():
+        if line.startswith('__elapsed__'):
+            return float(line.split()[1])
+    raise RuntimeError(f"Output benchmark tidak valid: {output}")
+
+def bench_startup(repeat=3):
+    from word_embedding import convert_tokenizer
+    if not os.path.exists(os.path.join(REPO_DIR, 'tokenizer.npz')):
+        convert_tokenizer(os.path.join(REPO_DIR, 'tokenizer.json'), os.path.join(REPO_DIR, 'tokenizer.npz'))
+    if not os.path.exists(os.path.join(REPO_DIR, 'lexicon.bin')):
+        from lexicon import build_lexicon
+        build_lexicon(os.path.join(REPO_DIR, 'lexicon.bin'), os.path.join(REPO_DIR, 'kamus_slang.json'))
+
+    results = {}
+    for name, code in STARTUP_CASES.items():
+        times = [_time_in_subprocess(code) for _ in range(repeat)]
+        results[name] = {'median_s': statistics.median(times), 'min_s': min(times)}
+        print(f"{name:<28} median {results[name]['median_s'] * 1000:9.1f} ms")
+    return results
+
+def build_dummy_model(vocab_size=10000, max_length=50, embedding_dim=300, seed=0, mask_zero=False):
+    # Arsitektur sama dengan model skenario (lihat notebook), bobot acak dengan seed tetap
+    import tensorflow as tf
+    tf.keras.utils.set_random_seed(seed)
+    return tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(max_length,)),
+        tf.keras.layers.Embedding(vocab_size, embedding_dim, mask_zero=mask_zero),
+        tf.keras.layers.LSTM(64, dropout=0.2),
+        tf.keras.layers.Dense(32, activation='relu'),
+        tf.keras.layers.Dense(1, activation='sigmoid')
+    ])
+
+def load_model_builder(model_path=None, score_cache_size=0):
+    import tempfile
+    from preprocessing import Preprocessor
+    from word_embedding import WordEmbedding
+    from model_builder import ModelBuilder
+
+    word_embedding = WordEmbedding()
+    word_embedding.load_tokenizer(os.path.join(REPO_DIR, 'tokenizer.json'))
+    # Cache skor dimatikan secara default agar yang diukur adalah inferensi model
+    builder = ModelBuilder(Preprocessor(), word_embedding, score_cache_size=score_cache_size)
+    if model_path is None:
+        model_path = os.path.join(tempfile.mkdtemp(), 'dummy.h5')
+        build_dummy_model().save(model_path)
+    if not builder.load_model(model_path):
+        raise RuntimeError(f"Gagal memuat model {model_path}")
+    return builder
+
+def _median_time(fn, repeat):
+    fn()  # warmup (trace graph / alokasi awal)
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return statistics.median(times)
+
+def bench_inference(model_path=None, batch_sizes=(1, 8, 64, 1024), repeat=20):
+    builder = load_model_builder(model_path)
+    rng = np.random.default_rng(0)
+    results = {}
+    for batch_size in batch_sizes:
+        sequences = rng.integers(0, 10000, size=(batch_size, 50), dtype=np.int32)
+        t_predict = _median_time(lambda: builder.model.predict(sequences, verbose=0), repeat)
+        t_builder = _median_time(lambda: builder.classify_sequences(sequences), repeat)
+        results[f"batch_{batch_size}"] = {'predict_s': t_predict, 'classify_sequences_s': t_builder}
+        print(f"batch {batch_size:>5}: model.predict {t_predict * 1000:9.2f} ms | "
+              f"classify_sequences {t_builder * 1000:9.2f} ms")
+    return results
+
+def bench_tflite(model_path=None, batch_sizes=(1, 8, 64, 1024), repeat=20, threads=None):
+    import tempfile
+    from tflite_export import QUANTIZATIONS, export_tflite
+
+    if model_path is None:
+        model_path = os.path.join(tempfile.mkdtemp(), 'dummy.h5')
+        build_dummy_model().save(model_path)
+    builder = load_model_builder(model_path)
+    builder.tflite_threads = threads
+    backends = {'keras': model_path}
+    for quantization in QUANTIZATIONS:
+        output_path = os.path.join(tempfile.mkdtemp(), f"model.{quantization}.tflite")
+        backends[quantization] = export_tflite(model_path, quantization, output_path)
+
+    rng = np.random.default_rng(0)
+    inputs = {b: rng.integers(0, 10000, size=(b, 50), dtype=np.int32) for b in batch_sizes}
+    results = {}
+    for name, path in backends.items():
+        if not builder.load_model(path):
+            raise RuntimeError(f"Gagal memuat model {path}")
+        results[name] = {'size_bytes': os.path.getsize(path)}
+        for batch_size, sequences in inputs.items():
+            t = _median_time(lambda: builder.classify_sequences(sequences), repeat)
+            results[name][f"batch_{batch_size}_s"] = t
+            print(f"{name:<8} batch {batch_size:>5}: {t * 1000:9.2f} ms")
+    return results
+
+def bench_bucketing(model_path=None, repeat=10):
+    import tempfile
+    import pandas as pd
+    from model_builder import ModelBuilder
+
+    if model_path is None:
+        # Model skenario tidak me-mask padding; varian mask_zero=True menunjukkan jalur bucket
+        model_paths = {}
+        for mask_zero in (False, True):
+            model_paths[f"mask_zero_{mask_zero}"] = os.path.join(tempfile.mkdtemp(), 'dummy.h5')
+            build_dummy_model(mask_zero=mask_zero).save(model_paths[f"mask_zero_{mask_zero}"])
+    else:
+        model_paths = {'model': model_path}
+
+    base = load_model_builder(model_paths[next(iter(model_paths))])
+    texts = pd.read_csv(os.path.join(REPO_DIR, 'data_validasi_mentah.csv'))['text'].tolist()
+    processed = [" ".join(tokens) for tokens in base.preprocessor.preprocess_batch(texts)]
+    sequences = base.word_embedding.get_sequences(processed)
+
+    results = {}
+    for name, path in model_paths.items():
+        scores = {}
+        results[name] = {}
+        for bucketing in (False, True):
+            builder = ModelBuilder(base.preprocessor, base.word_embedding, length_bucketing=bucketing)
+            if not builder.load_model(path):
+                raise RuntimeError(f"Gagal memuat model {path}")
+            scores[bucketing] = builder.classify_sequences(sequences)
+            key = 'bucketed_s' if bucketing else 'padded_s'
+            results[name][key] = _median_time(lambda: builder.classify_sequences(sequences), repeat)
+        results[name]['max_abs_diff'] = float(np.abs(scores[True] - scores[False]).max())
+        r = results[name]
+        print(f"{name:<16} padded {r['padded_s'] * 1000:9.2f} ms | bucketed {r['bucketed_s'] * 1000:9.2f} ms | "
+              f"selisih skor maks {r['max_abs_diff']:.2e}")
+    return results
+
+def bench_ensemble(model_paths=None, repeat=5):
+    import tempfile
+    import pandas as pd
+    from model_builder import ModelBuilder
+
+    if not model_paths:
+        # Tiga model acak dengan seed berbeda menggantikan skenario peringkat 6/5/2
+        model_paths = []
+        for seed in range(3):
+            model_paths.append(os.path.join(tempfile.mkdtemp(), f'dummy_{seed}.h5'))
+            build_dummy_model(seed=seed).save(model_paths[-1])
+
+    base = load_model_builder(model_paths[0])
+    texts = pd.read_csv(os.path.join(REPO_DIR, 'data_validasi_mentah.csv'))['text'].tolist()
+    processed = [" ".join(tokens) for tokens in base.preprocessor.preprocess_batch(texts)]
+
+    builders = []
+    for path in model_paths:
+        builder = ModelBuilder(base.preprocessor, base.word_embedding, score_cache_size=0)
+        if not builder.load_model(path):
+            raise RuntimeError(f"Gagal memuat model {path}")
+        builders.append(builder)
+
+    def separate():
+        # Jalur lama: tiap skenario meng-encode ulang teks lalu dinilai bergantian
+        return [b.classify_sequences(b.word_embedding.get_sequences(processed)) for b in builders]
+
+    ensemble = ModelBuilder(base.preprocessor, base.word_embedding, score_cache_size=0)
+    if not ensemble.load_ensemble(model_paths):
+        raise RuntimeError("Gagal memuat ensemble")
+
+    reference = separate()
+    scores, _ = ensemble.classify_ensemble(processed)
+    results = {
+        'models': len(model_paths),
+        'separate_s': _median_time(separate, repeat),
+        'ensemble_s': _median_time(lambda: ensemble.classify_ensemble(processed), repeat),
+        'max_abs_diff': float(max(np.abs(scores[path] - ref).max() for path, ref in zip(model_paths, reference))),
+    }
+    print(f"{results['models']} model: terpisah {results['separate_s'] * 1000:9.2f} ms | "
+          f"ensemble {results['ensemble_s'] * 1000:9.2f} ms | selisih skor maks {results['max_abs_diff']:.2e}")
+    return results
+
+def bench_store(model_path=None, repeat=3):
+    import tempfile
+    import pandas as pd
+    from sequence_store import SequenceStore, append_to_store
+
+    builder = load_model_builder(model_path)
+    texts = pd.read_csv(os.path.join(REPO_DIR, 'dataset_judol_BALANCED_19k.csv'))['text'].tolist()
+    store_path = os.path.join(tempfile.mkdtemp(), 'arsip.seq')
+    with contextlib.redirect_stdout(io.StringIO()):
+        append_to_store(store_path, [texts], builder.preprocessor, builder.word_embedding, 'dataset', workers=1)
+    store = SequenceStore(store_path)
+
+    def from_text():
+        # Jalur lama: preprocessing + encoding ulang setiap kali arsip diskor dengan checkpoint baru
+        processed = [" ".join(tokens) for tokens in builder.preprocessor.preprocess_batch(texts, workers=1)]
+        return builder.classify_batch(processed)
+
+    reference = from_text()
+    scores = builder.classify_store(store)
+    results = {
+        'rows': len(store),
+        'text_s': _median_time(from_text, repeat),
+        'store_s': _median_time(lambda: builder.classify_store(store), repeat),
+        'max_abs_diff': float(np.abs(np.asarray(reference) - scores).max()),
+    }
+    print(f"{results['rows']} baris: dari teks {results['text_s']:.2f} s | dari store (memmap) {results['store_s']:.2f} s | "
+          f"selisih skor maks {results['max_abs_diff']:.2e}")
+    return results
+
+def bench_pipeline(model_path=None, workers=1, batch_size=2000, repeat=3):
+    import pandas as pd
+    from pipeline import ClassificationPipeline
+    from stream_classifier import classify_chunk
+
+    builder = load_model_builder(model_path)
+    df = pd.read_csv(os.path.join(REPO_DIR, 'dataset_judol_BALANCED_19k.csv'))[['text']]
+    chunks = [df.iloc[i:i + batch_size].reset_index(drop=True) for i in range(0, len(df), batch_size)]
+
+    def sequential():
+        # Jalur lama: preprocessing lalu inferensi bergantian per chunk
+        return pd.concat([classify_chunk(c, builder.preprocessor, builder, workers=workers) for c in chunks])
+
+    pipeline = ClassificationPipeline(builder.preprocessor, builder, workers=workers, batch_size=batch_size)
+
+    def pipelined():
+        return pd.concat(list(pipeline.run(chunks)))
+
+    reference = sequential()
+    result = pipelined()
+    results = {
+        'rows': len(df),
+        'workers': workers,
+        'sequential_s': _median_time(sequential, repeat),
+        'pipelined_s': _median_time(pipelined, repeat),
+        'stage_s': dict(pipeline.stage_seconds),
+        'identical': bool((reference['processed_text'].to_numpy() == result['processed_text'].to_numpy()).all()
+                          and np.array_equal(reference['skor_prediksi'].to_numpy(), result['skor_prediksi'].to_numpy())),
+    }
+    print(f"{results['rows']} baris, {workers} worker: berurutan {results['sequential_s']:.2f} s | "
+          f"pipeline {results['pipelined_s']:.2f} s | hasil sama: {results['identical']}")
+    print("   waktu sibuk per tahap: " + ", ".join(f"{k} {v:.2f} s" for k, v in results['stage_s'].items()))
+    return results
+
+def _run_load(classify_fn, texts, concurrency, duration):
+    import threading
+    latencies = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(offset):
+        i = offset
+        local = []
+        while time.perf_counter() < stop_at:
+            t = time.perf_counter()
+            classify_fn(texts[i % len(texts)])
+            local.append(time.perf_counter() - t)
+            i += concurrency
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(concurrency)]
+    t_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - t_start
+    latencies = np.array(latencies)
+    return {
+        'requests': int(len(latencies)),
+        'requests_per_s': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000),
+    }
+
+def bench_microbatch(model_path=None, concurrency=(1, 8, 32), duration=5.0, max_batch_size=64, max_wait_ms=5):
+    import pandas as pd
+    from micro_batcher import MicroBatcher
+
+    builder = load_model_builder(model_path)
+    texts = pd.read_csv(os.path.join(REPO_DIR, 'data_validasi_mentah.csv'))['text'].tolist()
+    # Panaskan cache stemming agar yang diukur adalah jalur inferensi
+    for text in texts:
+        builder.preprocessor.preprocess_text(text)
+
+    results = {}
+    for n_clients in concurrency:
+        with contextlib.redirect_stdout(io.StringIO()):
+            direct = _run_load(builder.classify_text, texts, n_clients, duration)
+        batcher = MicroBatcher(builder, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        batched = _run_load(batcher.classify_text, texts, n_clients, duration)
+        batched['avg_batch_size'] = batcher.stats()['avg_batch_size']
+        batcher.close()
+        results[f"clients_{n_clients}"] = {'classify_text': direct, 'micro_batcher': batched}
+        for name, r in (('classify_text', direct), ('micro_batcher', batched)):
+            print(f"clients {n_clients:>3} {name:<14} {r['requests_per_s']:9.1f} req/s | "
+                  f"p50 {r['p50_ms']:8.2f} ms | p99 {r['p99_ms']:8.2f} ms")
+    return results
+
+def bench_http(model_path=None, concurrency=(1, 8, 32), duration=5.0):
+    import tempfile
+    import threading
+    import urllib.request
+    import pandas as pd
+    from inference_server import InferenceService, create_server
+
+    if model_path is None:
+        model_path = os.path.join(tempfile.mkdtemp(), 'dummy.h5')
+        build_dummy_model().save(model_path)
+    service = InferenceService(model_path, os.path.join(REPO_DIR, 'tokenizer.json'))
+    server = create_server(service, port=0, workers=max(concurrency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/classify"
+
+    def post(text):
+        request = urllib.request.Request(url, data=json.dumps({'text': text}).encode('utf-8'), method='POST')
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())['score']
+
+    texts = pd.read_csv(os.path.join(REPO_DIR, 'data_validasi_mentah.csv'))['text'].tolist()
+    for text in texts:
+        service.preprocessor.preprocess_text(text)
+
+    results = {}
+    try:
+        for n_clients in concurrency:
+            r = _run_load(post, texts, n_clients, duration)
+            results[f"clients_{n_clients}"] = r
+            print(f"clients {n_clients:>3} /classify {r['requests_per_s']:9.1f} req/s | "
+                  f"p50 {r['p50_ms']:8.2f} ms | p99 {r['p99_ms']:8.2f} ms")
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+    return results
+
+def bench_core(model_path=None, batch_sizes=(1, 8, 64, 256, 1024), repeat=10):
+    import tempfile
+    import pandas as pd
+    from instrumentation import profiler
+    from preprocessing import Preprocessor
+    from word_embedding import WordEmbedding, convert_tokenizer
+    from model_builder import ModelBuilder
+
+    results = {}
+    texts = pd.read_csv(os.path.join(REPO_DIR, 'data_validasi_mentah.csv'))['text'].tolist()
+
+    # --- Cold start ---
+    tokenizer_json = os.path.join(REPO_DIR, 'tokenizer.json')
+    tokenizer_slim = os.path.join(tempfile.mkdtemp(), 'tokenizer.npz')
+    convert_tokenizer(tokenizer_json, tokenizer_slim)
+    word_embedding = WordEmbedding()
+    t = time.perf_counter()
+    word_embedding.load_tokenizer(tokenizer_json)
+    results['cold_start.load_tokenizer_json_s'] = time.perf_counter() - t
+    t = time.perf_counter()
+    word_embedding.load_tokenizer(tokenizer_slim)
+    results['cold_start.load_tokenizer_slim_s'] = time.perf_counter() - t
+
+    if model_path is None:
+        model_path = os.path.join(tempfile.mkdtemp(), 'dummy.h5')
+        build_dummy_model().save(model_path)
+    preprocessor = Preprocessor()
+    builder = ModelBuilder(preprocessor, word_embedding, score_cache_size=0)
+    t = time.perf_counter()
+    if not builder.load_model(model_path):
+        raise RuntimeError(f"Gagal memuat model {model_path}")
+    results['cold_start.load_model_s'] = time.perf_counter() - t
+
+    # --- Preprocessing per tahap (cache stemming masih kosong) ---
+    profiler.reset()
+    profiler.enable()
+    t = time.perf_counter()
+    processed = [" ".join(preprocessor.preprocess_text(text)) for text in texts]
+    results['preprocess.cold_total_s'] = time.perf_counter() - t
+    for name, stat in profiler.snapshot().items():
+        results[f"{name}_s"] = stat['total_s']
+    profiler.disable()
+    profiler.reset()
+    t = time.perf_counter()
+    for text in texts:
+        preprocessor.preprocess_text(text)
+    results['preprocess.warm_total_s'] = time.perf_counter() - t
+
+    # --- Encoding & inferensi ---
+    results['word_embedding.get_sequences_s'] = _median_time(lambda: word_embedding.get_sequences(processed), repeat)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results['classify_text_s'] = _median_time(lambda: builder.classify_text(texts[0]), repeat)
+    for batch_size in batch_sizes:
+        batch = (processed * (batch_size // len(processed) + 1))[:batch_size]
+        results[f"classify_batch.{batch_size}_s"] = _median_time(lambda: builder.classify_batch(batch), repeat)
+
+    # --- End-to-end (cache stemming hangat) ---
+    t = time.perf_counter()
+    builder.classify_batch([" ".join(preprocessor.preprocess_text(text)) for text in texts])
+    results['end_to_end.rows_per_s'] = len(texts) / (time.perf_counter() - t)
+
+    # --- Cache skor: batch pertama (deduplikasi saja) lalu batch yang sama lagi ---
+    cached_builder = ModelBuilder(preprocessor, word_embedding)
+    cached_builder.load_model(model_path)
+    cached_builder.classify_sequences(word_embedding.get_sequences(processed))  # warmup trace model baru
+    t = time.perf_counter()
+    cached_builder.classify_batch(processed)
+    results['score_cache.cold_s'] = time.perf_counter() - t
+    t = time.perf_counter()
+    cached_builder.classify_batch(processed)
+    results['score_cache.warm_s'] = time.perf_counter() - t
+    results['score_cache.hit_rate'] = cached_builder.score_cache_info()['hit_rate']
+
+    for name, value in results.items():
+        print(f"{name:<40} {value:12.4f}")
+    return results
+
+def flatten_results(results, prefix=''):
+    flat = {}
+    for name, value in results.items():
+        key = f"{prefix}{name}"
+        if isinstance(value, dict):
+            flat.update(flatten_results(value, f"{key}."))
+        elif isinstance(value, (int, float)):
+            flat[key] = value
+    return flat
+
+def compare_results(baseline, current, threshold=0.10):
+    # Metrik berakhiran _per_s: makin besar makin baik; _s / _ms: makin kecil makin baik
+    baseline = flatten_results(baseline)
+    current = flatten_results(current)
+    regressions = []
+    for name, new in current.items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        change = (new - old) / old
+        if name.endswith('_per_s'):
+            regressed = change < -threshold
+        elif name.endswith('_s') or name.endswith('_ms'):
+            regressed = change > threshold
+        else:
+            continue
+        flag = "REGRESI" if regressed else ""
+        print(f"{name:<48} {old:12.4f} -> {new:12.4f} ({change * 100:+6.1f}%) {flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline klasifikasi komentar")
+    parser.add_argument('suite', choices=['core', 'startup', 'inference', 'tflite', 'bucketing', 'ensemble', 'store', 'pipeline', 'microbatch', 'http', 'compare'])
+    parser.add_argument('files', nargs='*', help="Untuk 'compare': BASELINE.json CURRENT.json")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--model', help="Path model .h5/.tflite (default: model LSTM acak dengan arsitektur yang sama)")
+    parser.add_argument('--workers', type=int, default=1, help="Untuk 'pipeline': jumlah proses preprocessing")
+    parser.add_argument('--models', nargs='+', help="Untuk 'ensemble': path beberapa model")
+    parser.add_argument('--output', help="Simpan hasil ke file JSON")
+    parser.add_argument('--baseline', help="Bandingkan hasil dengan file JSON baseline")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Batas regresi relatif (default 0.10 = 10%%)")
+    args = parser.parse_args()
+
+    if args.suite == 'compare':
+        if len(args.files) != 2:
+            parser.error("compare membutuhkan dua file: BASELINE.json CURRENT.json")
+        with open(args.files[0], encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.files[1], encoding='utf-8') as f:
+            results = json.load(f)
+        regressions = compare_results(baseline, results, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    if args.suite == 'core':
+        results = bench_core(args.model, repeat=args.repeat)
+    elif args.suite == 'startup':
+        results = bench_startup(args.repeat)
+    elif args.suite == 'inference':
+        results = bench_inference(args.model, repeat=args.repeat)
+    elif args.suite == 'tflite':
+        results = bench_tflite(args.model, repeat=args.repeat)
+    elif args.suite == 'bucketing':
+        results = bench_bucketing(args.model, repeat=args.repeat)
+    elif args.suite == 'ensemble':
+        results = bench_ensemble(args.models, repeat=args.repeat)
+    elif args.suite == 'store':
+        results = bench_store(args.model, repeat=args.repeat)
+    elif args.suite == 'pipeline':
+        results = bench_pipeline(args.model, workers=args.workers, repeat=args.repeat)
+    elif args.suite == 'microbatch':
+        results = bench_microbatch(args.model)
+    elif args.suite == 'http':
+        results = bench_http(args.model)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Hasil benchmark disimpan ke {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, results, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metrik mengalami regresi.")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import argparse
+import io
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+
+CORPUS_STORE_PATH = 'corpus_store.npz'
+
+def _pack_strings(strings):
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+def _unpack_strings(blob, offsets):
+    data = blob.tobytes()
+    return [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+def lexicon_snapshot(preprocessor):
+    return {'slang': dict(preprocessor.kamus_slang), 'stopwords': sorted(preprocessor.list_stopwords_final)}
+
+def changed_words(old_lexicon, new_lexicon):
+    # Kunci slang yang ditambah/dihapus/diubah nilainya + stopword yang ditambah/dihapus
+    old_slang, new_slang = old_lexicon['slang'], new_lexicon['slang']
+    words = {k for k in old_slang.keys() | new_slang.keys() if old_slang.get(k) != new_slang.get(k)}
+    words |= set(old_lexicon['stopwords']) ^ set(new_lexicon['stopwords'])
+    return words
+
+def _postings(dependency_sets, ids, vocab):
+    # Pasangan (indeks kata, id komentar) untuk indeks terbalik; vocab (dict kata -> indeks) diperluas di tempat
+    word_idx, comment_ids = [], []
+    for i, deps in zip(ids, dependency_sets):
+        for word in deps:
+            word_idx.append(vocab.setdefault(word, len(vocab)))
+        comment_ids.extend([i] * len(deps))
+    return np.asarray(word_idx, dtype=np.int64), np.asarray(comment_ids, dtype=np.int32)
+
+def _to_csr(word_idx, comment_ids, n_words):
+    order = np.argsort(word_idx, kind='stable')
+    indptr = np.zeros(n_words + 1, dtype=np.int64)
+    np.cumsum(np.bincount(word_idx, minlength=n_words), out=indptr[1:])
+    return indptr, comment_ids[order]
+
+class ScoredCorpus:
+    # Komentar mentah + hasil preprocessing + skor, ditambah indeks terbalik kata -> komentar untuk
+    # setiap kata yang dicari di kamus slang / stopword saat preprocessing. Setelah kamus_slang.json
+    # atau stopword diubah, hanya komentar yang memuat kata yang berubah yang diproses dan diskor ulang.
+    def __init__(self, texts, processed, scores, words, indptr, comment_ids, lexicon, model_key):
+        self.texts = texts
+        self.processed = processed
+        self.scores = scores
+        self.words = words
+        self._vocab = {word: i for i, word in enumerate(words)}
+        self.indptr = indptr
+        self.comment_ids = comment_ids
+        self.lexicon = lexicon
+        self.model_key = model_key
+
+    def __len__(self):
+        return len(self.texts)
+
+    @staticmethod
+    def _model_key(model_builder):
+        return json.dumps(model_builder.active_model_key)
+
+    @classmethod
+    def build(cls, texts, preprocessor, model_builder, workers=None):
+        texts = [text if isinstance(text, str) else '' for text in texts]
+        results = preprocessor.preprocess_batch(texts, workers=workers, track_dependencies=True)
+        processed = [" ".join(tokens) for tokens, _ in results]
+        scores = np.asarray(model_builder.classify_batch(processed), dtype=np.float32)
+
+        vocab = {}
+        word_idx, comment_ids = _postings((deps for _, deps in results), range(len(texts)), vocab)
+        indptr, comment_ids = _to_csr(word_idx, comment_ids, len(vocab))
+        return cls(texts, processed, scores, list(vocab), indptr, comment_ids,
+                   lexicon_snapshot(preprocessor), cls._model_key(model_builder))
+
+    def affected_ids(self, words):
+        postings = [self.comment_ids[self.indptr[i]:self.indptr[i + 1]]
+                    for i in (self._vocab.get(word) for word in words) if i is not None]
+        if not postings:
+            return np.zeros(0, dtype=np.int32)
+        return np.unique(np.concatenate(postings))
+
+    def update(self, preprocessor, model_builder, workers=None):
+        t_start = time.perf_counter()
+        new_lexicon = lexicon_snapshot(preprocessor)
+        words = changed_words(self.lexicon, new_lexicon)
+        ids = self.affected_ids(words)
+
+        results = preprocessor.preprocess_batch([self.texts[i] for i in ids], workers=workers, track_dependencies=True)
+        new_processed = [" ".join(tokens) for tokens, _ in results]
+        changed = [(i, text) for i, text in zip(ids.tolist(), new_processed) if text != self.processed[i]]
+        for i, text in changed:
+            self.processed[i] = text
+
+        model_key = self._model_key(model_builder)
+        if model_key != self.model_key:
+            # Checkpoint berbeda dari saat korpus diskor: semua skor harus dihitung ulang
+            print(f"Model berubah ({self.model_key} -> {model_key}), semua {len(self)} komentar diskor ulang")
+            rescore_ids = list(range(len(self)))
+            self.model_key = model_key
+        else:
+            rescore_ids = [i for i, _ in changed]
+        if rescore_ids:
+            self.scores[rescore_ids] = model_builder.classify_batch([self.processed[i] for i in rescore_ids])
+
+        # Posting komentar yang diproses ulang diganti dengan dependensi barunya
+        if len(ids):
+            word_idx = np.repeat(np.arange(len(self.words), dtype=np.int64), np.diff(self.indptr))
+            keep = ~np.isin(self.comment_ids, ids)
+            new_word_idx, new_comment_ids = _postings((deps for _, deps in results), ids.tolist(), self._vocab)
+            self.words = list(self._vocab)
+            self.indptr, self.comment_ids = _to_csr(
+                np.concatenate([word_idx[keep], new_word_idx]),
+                np.concatenate([self.comment_ids[keep], new_comment_ids]),
+                len(self.words)
+            )
+        self.lexicon = new_lexicon
+
+        stats = {
+            'changed_words': len(words),
+            'reprocessed': int(len(ids)),
+            'processed_changed': len(changed),
+            'rescored': len(rescore_ids),
+            'total': len(self),
+            'seconds': time.perf_counter() - t_start,
+        }
+        print(f"Kata berubah: {stats['changed_words']} | diproses ulang: {stats['reprocessed']} | "
+              f"teks berubah: {stats['processed_changed']} | diskor ulang: {stats['rescored']} dari {stats['total']} "
+              f"komentar ({stats['seconds']:.2f} detik)")
+        return stats
+
+    def to_frame(self):
+        return pd.DataFrame({
+            'text': self.texts,
+            'processed_text': self.processed,
+            'skor_prediksi': self.scores,
+            'klasifikasi': np.where(self.scores >= 0.5, "Judi Online", "Non-Judi Online"),
+        })
+
+    def save(self, path=CORPUS_STORE_PATH):
+        texts_blob, texts_offsets = _pack_strings(self.texts)
+        processed_blob, processed_offsets = _pack_strings(self.processed)
+        words_blob, words_offsets = _pack_strings(self.words)
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            texts_blob=texts_blob, texts_offsets=texts_offsets,
+            processed_blob=processed_blob, processed_offsets=processed_offsets,
+            scores=self.scores,
+            words_blob=words_blob, words_offsets=words_offsets,
+            indptr=self.indptr, comment_ids=self.comment_ids,
+            lexicon_json=np.array(json.dumps(self.lexicon, ensure_ascii=False)),
+            model_key=np.array(self.model_key),
+        )
+        # Tulis ke file sementara lalu rename agar store tidak pernah terbaca setengah jadi
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+        print(f"Korpus ({len(self)} komentar, {len(self.words)} kata terindeks) disimpan ke {path}")
+        return path
+
+    @classmethod
+    def load(cls, path=CORPUS_STORE_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                _unpack_strings(data['texts_blob'], data['texts_offsets']),
+                _unpack_strings(data['processed_blob'], data['processed_offsets']),
+                data['scores'],
+                _unpack_strings(data['words_blob'], data['words_offsets']),
+                data['indptr'],
+                data['comment_ids'],
+                json.loads(str(data['lexicon_json'])),
+                str(data['model_key']),
+            )
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Skor korpus komentar lalu skor ulang secara inkremental setelah kamus slang / stopword diubah"
+    )
+    parser.add_argument('command', choices=['build', 'update'])
+    parser.add_argument('input', nargs='?', help="Untuk 'build': CSV dengan kolom 'text'")
+    parser.add_argument('--model', required=True, help="Path model .h5/.tflite")
+    parser.add_argument('--tokenizer', default='tokenizer.json')
+    parser.add_argument('--store', default=CORPUS_STORE_PATH)
+    parser.add_argument('--csv', help="Tulis hasil klasifikasi ke file CSV")
+    parser.add_argument('--workers', type=int, help="Jumlah proses untuk preprocessing")
+    args = parser.parse_args()
+
+    from preprocessing import Preprocessor
+    from word_embedding import WordEmbedding
+    from model_builder import ModelBuilder
+
+    preprocessor = Preprocessor()
+    word_embedding = WordEmbedding()
+    word_embedding.load_tokenizer(args.tokenizer)
+    model_builder = ModelBuilder(preprocessor, word_embedding)
+    if not model_builder.load_model(args.model):
+        raise SystemExit(1)
+
+    if args.command == 'build':
+        if not args.input:
+            parser.error("'build' membutuhkan file CSV input")
+        corpus = ScoredCorpus.build(pd.read_csv(args.input)['text'], preprocessor, model_builder, args.workers)
+    else:
+        corpus = ScoredCorpus.load(args.store)
+        corpus.update(preprocessor, model_builder, args.workers)
+    corpus.save(args.store)
+    if args.csv:
+        corpus.to_frame().to_csv(args.csv, index=False)
+        print(f"Hasil klasifikasi disimpan ke {args.csv}")
+
+if __name__ == "__main__":
+    main()
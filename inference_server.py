@@ -0,0 +1,227 @@
+import argparse
+import bisect
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from preprocessing import Preprocessor
+from word_embedding import WordEmbedding
+from model_builder import ModelBuilder
+from micro_batcher import MicroBatcher
+from instrumentation import profiler
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.total += seconds
+            self.count += 1
+
+    def to_prometheus(self, name, labels):
+        with self._lock:
+            lines = []
+            cumulative = 0
+            for bound, n in zip(self.buckets, self.counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+            lines.append(f'{name}_sum{{{labels}}} {self.total}')
+            lines.append(f'{name}_count{{{labels}}} {self.count}')
+            return lines
+
+class InferenceService:
+    # Preprocessor, WordEmbedding dan model dimuat sekali; permintaan tunggal digabung lewat MicroBatcher
+    def __init__(self, model_path, tokenizer_path='tokenizer.json', max_batch_size=64, max_wait_ms=5, tflite_threads=None):
+        self.model_path = model_path
+        self.preprocessor = Preprocessor()
+        self.word_embedding = WordEmbedding()
+        self.word_embedding.load_tokenizer(tokenizer_path)
+        self.model_builder = ModelBuilder(self.preprocessor, self.word_embedding, tflite_threads=tflite_threads)
+        if not self.model_builder.load_model(model_path):
+            raise RuntimeError(f"Gagal memuat model {model_path}")
+        self.batcher = MicroBatcher(self.model_builder, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self.latency = {'/classify': LatencyHistogram(), '/classify_batch': LatencyHistogram()}
+        self.errors = {'/classify': 0, '/classify_batch': 0}
+        self.items_classified = 0
+        self._lock = threading.Lock()
+
+    def classify(self, text):
+        score = self.batcher.classify_text(text)
+        with self._lock:
+            self.items_classified += 1
+        return score
+
+    def classify_batch(self, texts):
+        processed = [' '.join(self.preprocessor.preprocess_text(text)) for text in texts]
+        scores = [float(s) for s in self.model_builder.classify_batch(processed)] if processed else []
+        with self._lock:
+            self.items_classified += len(scores)
+        return scores
+
+    def record_error(self, endpoint):
+        with self._lock:
+            self.errors[endpoint] += 1
+
+    def metrics_text(self):
+        lines = [
+            '# HELP judol_request_latency_seconds Latensi permintaan per endpoint.',
+            '# TYPE judol_request_latency_seconds histogram',
+        ]
+        for endpoint, histogram in self.latency.items():
+            lines.extend(histogram.to_prometheus('judol_request_latency_seconds', f'endpoint="{endpoint}"'))
+        lines.append('# TYPE judol_request_errors_total counter')
+        for endpoint, n in self.errors.items():
+            lines.append(f'judol_request_errors_total{{endpoint="{endpoint}"}} {n}')
+        lines.append('# TYPE judol_items_classified_total counter')
+        lines.append(f'judol_items_classified_total {self.items_classified}')
+        batcher_stats = self.batcher.stats()
+        lines.append('# TYPE judol_microbatch_avg_size gauge')
+        lines.append(f"judol_microbatch_avg_size {batcher_stats['avg_batch_size']}")
+        score_cache = self.model_builder.score_cache_info()
+        lines.append('# TYPE judol_score_cache_hits_total counter')
+        lines.append(f"judol_score_cache_hits_total {score_cache['hits']}")
+        lines.append('# TYPE judol_score_cache_misses_total counter')
+        lines.append(f"judol_score_cache_misses_total {score_cache['misses']}")
+        lines.append('# TYPE judol_score_cache_size gauge')
+        lines.append(f"judol_score_cache_size {score_cache['size']}")
+        return '\n'.join(lines) + '\n' + profiler.to_prometheus()
+
+    def close(self):
+        self.batcher.close()
+
+def label_for(score):
+    return "Judi Online" if score >= 0.5 else "Non-Judi Online"
+
+class InferenceRequestHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def _send(self, status, body, content_type='application/json'):
+        data = body.encode('utf-8') if isinstance(body, str) else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._send(200, self.service.metrics_text(), 'text/plain; version=0.0.4')
+        elif self.path == '/health':
+            self._send(200, {'status': 'ok', 'model': self.service.model_path})
+        else:
+            self._send(404, {'error': 'Endpoint tidak ditemukan.'})
+
+    def do_POST(self):
+        if self.path not in self.service.latency:
+            self._send(404, {'error': 'Endpoint tidak ditemukan.'})
+            return
+        t_start = time.perf_counter()
+        try:
+            payload = self._read_json()
+            if not isinstance(payload, dict):
+                raise ValueError("Body harus berupa objek JSON.")
+            if self.path == '/classify':
+                text = payload.get('text')
+                if not isinstance(text, str):
+                    raise ValueError("Field 'text' (string) wajib diisi.")
+                score = self.service.classify(text)
+                body = {'score': score, 'klasifikasi': label_for(score)}
+            else:
+                texts = payload.get('texts')
+                if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                    raise ValueError("Field 'texts' (list of string) wajib diisi.")
+                scores = self.service.classify_batch(texts)
+                body = {'scores': scores, 'klasifikasi': [label_for(s) for s in scores]}
+            self._send(200, body)
+        except ValueError as e:
+            self.service.record_error(self.path)
+            self._send(400, {'error': str(e)})
+        except Exception as e:
+            self.service.record_error(self.path)
+            self._send(500, {'error': str(e)})
+        finally:
+            self.service.latency[self.path].observe(time.perf_counter() - t_start)
+
+    def log_message(self, format, *args):
+        pass
+
+class PooledHTTPServer(HTTPServer):
+    # Setiap koneksi ditangani oleh thread dari pool berukuran tetap (bukan satu thread per koneksi).
+    # Maksimal workers + max_pending koneksi diterima sekaligus; selebihnya loop accept menunggu slot
+    # kosong sehingga koneksi baru tertahan di backlog socket (request_queue_size), bukan di antrian pool
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, workers=8, max_pending=None):
+        super().__init__(server_address, handler_class)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http-worker")
+        self._slots = threading.BoundedSemaphore(workers + (workers if max_pending is None else max_pending))
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        try:
+            self.pool.submit(self._process_request_worker, request, client_address)
+        except Exception:
+            self._slots.release()
+            self.shutdown_request(request)
+            raise
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+def create_server(service, host='127.0.0.1', port=8000, workers=8, max_pending=None):
+    handler = type('Handler', (InferenceRequestHandler,), {'service': service})
+    return PooledHTTPServer((host, port), handler, workers=workers, max_pending=max_pending)
+
+def main():
+    parser = argparse.ArgumentParser(description="Layanan HTTP lokal untuk klasifikasi komentar judi online")
+    parser.add_argument('--model', default='model 6.h5', help="Model .h5 atau hasil ekspor .tflite")
+    parser.add_argument('--tokenizer', default='tokenizer.json')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--max-pending', type=int, help="Koneksi yang boleh menunggu worker (default: sama dengan --workers)")
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5)
+    parser.add_argument('--tflite-threads', type=int, help="Jumlah thread interpreter untuk model .tflite")
+    parser.add_argument('--profile', action='store_true', help="Catat waktu per tahap pipeline di /metrics")
+    args = parser.parse_args()
+    if args.profile:
+        profiler.enable()
+
+    service = InferenceService(args.model, args.tokenizer, args.max_batch_size, args.max_wait_ms, args.tflite_threads)
+    server = create_server(service, args.host, args.port, args.workers, args.max_pending)
+    print(f"Layanan klasifikasi berjalan di http://{args.host}:{args.port} (model: {args.model})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+class StageProfiler:
+    # Pencatat waktu per tahap pipeline (opt-in). Saat tidak aktif, stage() tidak mencatat apa pun.
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    @contextmanager
+    def stage(self, name, items=1):
+        if not self.enabled:
+            yield
+            return
+        t_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - t_start, items)
+
+    def record(self, name, seconds, items=1):
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = self._stats[name] = {'calls': 0, 'items': 0, 'total_s': 0.0, 'max_s': 0.0}
+            stat['calls'] += 1
+            stat['items'] += items
+            stat['total_s'] += seconds
+            stat['max_s'] = max(stat['max_s'], seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: dict(
+                    stat,
+                    mean_ms=stat['total_s'] / stat['calls'] * 1000 if stat['calls'] else 0.0
+                )
+                for name, stat in self._stats.items()
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix='judol_stage'):
+        snapshot = self.snapshot()
+        lines = [
+            f'# HELP {prefix}_seconds_total Total waktu per tahap pipeline.',
+            f'# TYPE {prefix}_seconds_total counter',
+        ]
+        lines += [f'{prefix}_seconds_total{{stage="{name}"}} {stat["total_s"]}' for name, stat in snapshot.items()]
+        lines += [f'# TYPE {prefix}_calls_total counter']
+        lines += [f'{prefix}_calls_total{{stage="{name}"}} {stat["calls"]}' for name, stat in snapshot.items()]
+        lines += [f'# TYPE {prefix}_items_total counter']
+        lines += [f'{prefix}_items_total{{stage="{name}"}} {stat["items"]}' for name, stat in snapshot.items()]
+        return '\n'.join(lines) + '\n'
+
+# Profiler global yang dipakai Preprocessor, WordEmbedding dan ModelBuilder.
+# Aktifkan dengan JUDOL_PROFILE=1 atau profiler.enable().
+profiler = StageProfiler(enabled=os.environ.get('JUDOL_PROFILE') == '1')
@@ -0,0 +1,230 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+
+LEXICON_PATH = 'lexicon.bin'
+LEXICON_MAGIC = b'JDLX'
+LEXICON_VERSION = 1
+
+# Stopword tambahan di luar korpus NLTK; 'tidak' dan 'aku' sengaja tidak dibuang
+CUSTOM_STOPWORDS = {
+    'di', 'ke', 'ya', 'eh', 'he', 'nya', 'nih', 'sih', 'si', 'tau', 'tuh',
+    'dong', 'kok', 'wow', 'om', 'kak', 'bang', 'bro', 'cici', 'kakak', 'ka'
+}
+KEPT_WORDS = {'tidak', 'aku'}
+
+def build_stopwords():
+    # Satu-satunya tempat korpus NLTK dibutuhkan; saat runtime stopword dibaca dari lexicon.bin
+    from nltk.corpus import stopwords
+    stopwords_final = set(stopwords.words('indonesian')).union(stopwords.words('english')).union(CUSTOM_STOPWORDS)
+    return stopwords_final - KEPT_WORDS
+
+def _digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+def source_digest(kamus_path):
+    # Hash isi semua sumber lexicon.bin di luar korpus NLTK. Dicocokkan saat lexicon dimuat: mtime tidak
+    # berubah saat CUSTOM_STOPWORDS / KEPT_WORDS diedit, dan bisa menyesatkan setelah file disalin
+    with open(kamus_path, 'rb') as f:
+        kamus_bytes = f.read()
+    return _digest(LEXICON_VERSION, kamus_bytes, '\n'.join(sorted(CUSTOM_STOPWORDS)), '\n'.join(sorted(KEPT_WORDS)))
+
+def stopwords_digest(stopwords_final):
+    return _digest('\n'.join(sorted(stopwords_final)))
+
+def _pack_table(keys, values=None):
+    # Tabel hash open addressing (crc32, linear probing) di atas blob UTF-8:
+    # slots uint32 (indeks entri + 1, 0 = kosong), offset kunci uint32, blob kunci, [offset nilai, blob nilai]
+    encoded_keys = [k.encode('utf-8') for k in keys]
+    n_slots = 1
+    while n_slots < 2 * max(len(keys), 1):
+        n_slots *= 2
+    slots = [0] * n_slots
+    for i, key in enumerate(encoded_keys):
+        j = zlib.crc32(key) & (n_slots - 1)
+        while slots[j]:
+            j = (j + 1) & (n_slots - 1)
+        slots[j] = i + 1
+
+    def offsets_and_blob(items):
+        offsets = [0]
+        for item in items:
+            offsets.append(offsets[-1] + len(item))
+        return struct.pack(f'<{len(offsets)}I', *offsets), b''.join(items)
+
+    parts = {'slots': struct.pack(f'<{n_slots}I', *slots)}
+    parts['key_offsets'], parts['keys'] = offsets_and_blob(encoded_keys)
+    if values is not None:
+        parts['value_offsets'], parts['values'] = offsets_and_blob([v.encode('utf-8') for v in values])
+    return {'count': len(keys), 'n_slots': n_slots}, parts
+
+def build_lexicon(output_path=LEXICON_PATH, kamus_path='kamus_slang.json', stem_cache_path=None):
+    with open(kamus_path, 'r') as f:
+        kamus_slang = json.load(f)
+    stopwords_final = build_stopwords()
+    tables = {
+        'slang': _pack_table(list(kamus_slang), list(kamus_slang.values())),
+        'stopwords': _pack_table(sorted(stopwords_final)),
+    }
+    if stem_cache_path and os.path.exists(stem_cache_path):
+        with open(stem_cache_path, 'r', encoding='utf-8') as f:
+            stem_cache = json.load(f)
+        tables['stems'] = _pack_table(list(stem_cache), list(stem_cache.values()))
+
+    # Header JSON berisi offset tiap bagian; semua bagian disejajarkan ke 4 byte
+    header = {
+        'version': LEXICON_VERSION,
+        'source_digest': source_digest(kamus_path),
+        'stopwords_digest': stopwords_digest(stopwords_final),
+        'tables': {},
+    }
+    body = bytearray()
+    for name, (meta, parts) in tables.items():
+        meta = dict(meta)
+        for part_name, data in parts.items():
+            body.extend(b'\0' * (-len(body) % 4))
+            meta[part_name] = [len(body), len(data)]
+            body.extend(data)
+        header['tables'][name] = meta
+    header_bytes = json.dumps(header).encode('utf-8')
+    header_bytes += b' ' * (-(len(header_bytes) + 8) % 4)
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(LEXICON_MAGIC + struct.pack('<I', len(header_bytes)) + header_bytes)
+        f.write(body)
+    os.replace(tmp_path, output_path)
+    print(f"Lexicon disimpan ke {output_path} ({os.path.getsize(output_path) / 1024:.0f} KB, "
+          + ", ".join(f"{name}: {meta['count']}" for name, (meta, _) in tables.items()) + ")")
+    return output_path
+
+class MappedTable:
+    # Set/map string read-only di atas mmap: halaman file dipakai bersama oleh semua proses
+    # yang membuka lexicon yang sama (page cache OS), tanpa menyalin isinya ke heap Python
+    def __init__(self, buffer, meta):
+        self.count = meta['count']
+        self._mask = meta['n_slots'] - 1
+        self._slots = self._view(buffer, meta['slots']).cast('I')
+        self._key_offsets = self._view(buffer, meta['key_offsets']).cast('I')
+        self._keys = self._view(buffer, meta['keys'])
+        if 'values' in meta:
+            self._value_offsets = self._view(buffer, meta['value_offsets']).cast('I')
+            self._values = self._view(buffer, meta['values'])
+        else:
+            self._value_offsets = None
+
+    @staticmethod
+    def _view(buffer, span):
+        offset, length = span
+        return buffer[offset:offset + length]
+
+    def _find(self, word):
+        key = word.encode('utf-8')
+        key_offsets = self._key_offsets
+        j = zlib.crc32(key) & self._mask
+        while True:
+            entry = self._slots[j]
+            if not entry:
+                return -1
+            entry -= 1
+            if self._keys[key_offsets[entry]:key_offsets[entry + 1]] == key:
+                return entry
+            j = (j + 1) & self._mask
+
+    def _value(self, entry):
+        return str(self._values[self._value_offsets[entry]:self._value_offsets[entry + 1]], 'utf-8')
+
+    def __contains__(self, word):
+        return self._find(word) >= 0
+
+    def __len__(self):
+        return self.count
+
+    def get(self, word, default=None):
+        entry = self._find(word)
+        return self._value(entry) if entry >= 0 else default
+
+    def __iter__(self):
+        for entry in range(self.count):
+            yield str(self._keys[self._key_offsets[entry]:self._key_offsets[entry + 1]], 'utf-8')
+
+    def items(self):
+        for entry, key in enumerate(self):
+            yield key, self._value(entry)
+
+class Lexicon:
+    def __init__(self, filepath=LEXICON_PATH):
+        self.filepath = filepath
+        with open(filepath, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        if bytes(buffer[:4]) != LEXICON_MAGIC:
+            raise ValueError(f"{filepath} bukan file lexicon")
+        header_length = struct.unpack('<I', buffer[4:8])[0]
+        header = json.loads(bytes(buffer[8:8 + header_length]))
+        if header['version'] != LEXICON_VERSION:
+            raise ValueError(f"Versi lexicon {header['version']} tidak didukung (butuh {LEXICON_VERSION})")
+        body = buffer[8 + header_length:]
+        self.tables = {name: MappedTable(body, meta) for name, meta in header['tables'].items()}
+        self.source_digest = header.get('source_digest')
+        self.stopwords_digest = header.get('stopwords_digest')
+
+    def is_current(self, kamus_path, check_nltk=False):
+        # Cek runtime tanpa NLTK: digest sumber (kamus_slang.json, stopword tambahan, versi format) dan
+        # digest tabel stopword yang tersimpan harus cocok dengan header; lexicon lama tanpa digest dianggap
+        # usang. check_nltk=True juga membandingkan dengan stopword NLTK yang terpasang (lihat --check)
+        if os.path.exists(kamus_path) and self.source_digest != source_digest(kamus_path):
+            return False
+        if self.stopwords_digest != stopwords_digest(self.stopwords):
+            return False
+        if check_nltk:
+            return self.stopwords_digest == stopwords_digest(build_stopwords())
+        return True
+
+    @property
+    def slang(self):
+        return self.tables['slang']
+
+    @property
+    def stopwords(self):
+        return self.tables['stopwords']
+
+    @property
+    def stems(self):
+        return self.tables.get('stems')
+
+def lexicon_is_current(lexicon_path=LEXICON_PATH, kamus_path='kamus_slang.json', check_nltk=False):
+    if not os.path.exists(lexicon_path):
+        return False
+    try:
+        return Lexicon(lexicon_path).is_current(kamus_path, check_nltk=check_nltk)
+    except Exception as e:
+        print(f"ERROR: Gagal membaca lexicon dari {lexicon_path}: {e}")
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Bangun lexicon.bin (kamus slang + stopword + cache stemming)")
+    parser.add_argument('--output', default=LEXICON_PATH)
+    parser.add_argument('--kamus', default='kamus_slang.json')
+    parser.add_argument('--stem-cache', default='stem_cache.json', help="Cache stemming (opsional) yang ikut dibekukan")
+    parser.add_argument('--check', action='store_true',
+                        help="Hanya cek apakah --output masih sesuai dengan kamus dan stopword NLTK yang terpasang")
+    args = parser.parse_args()
+    if args.check:
+        if not lexicon_is_current(args.output, args.kamus, check_nltk=True):
+            print(f"{args.output} usang atau tidak ada; bangun ulang dengan python lexicon.py")
+            raise SystemExit(1)
+        print(f"{args.output} sesuai dengan {args.kamus} dan stopword NLTK.")
+        return
+    build_lexicon(args.output, args.kamus, args.stem_cache)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+class MicroBatcher:
+    # Menggabungkan permintaan klasifikasi tunggal yang datang bersamaan menjadi satu classify_batch.
+    # Batch dikirim saat mencapai max_batch_size atau setelah max_wait_ms sejak permintaan pertama.
+    def __init__(self, model_builder, max_batch_size=64, max_wait_ms=5):
+        self.model_builder = model_builder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches_run = 0
+        self.requests_served = 0
+        self._queue = queue.Queue()
+        self._closed = False
+        # Melindungi _closed bersama put ke antrian: tidak ada item yang masuk setelah sinyal berhenti
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="MicroBatcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, text_input):
+        future = Future()
+        # Preprocessing dilakukan di thread pemanggil; worker hanya menjalankan encoding + inferensi
+        try:
+            processed_text = ' '.join(self.model_builder.preprocessor.preprocess_text(text_input))
+        except Exception as e:
+            future.set_exception(e)
+            return future
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher sudah ditutup.")
+            self._queue.put((processed_text, future))
+        return future
+
+    def classify_text(self, text_input, timeout=None):
+        return self.submit(text_input).result(timeout)
+
+    async def classify_text_async(self, text_input):
+        return await asyncio.wrap_future(self.submit(text_input))
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._worker.join()
+
+    def stats(self):
+        return {
+            'batches_run': self.batches_run,
+            'requests_served': self.requests_served,
+            'avg_batch_size': self.requests_served / self.batches_run if self.batches_run else 0.0,
+        }
+
+    def _collect_batch(self, first_item):
+        batch = [first_item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Teruskan sinyal berhenti setelah batch terakhir diproses
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _fail_pending(self):
+        # Pengaman: permintaan yang tersisa di antrian setelah sinyal berhenti tidak boleh menggantung
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                item[1].set_exception(RuntimeError("MicroBatcher sudah ditutup."))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._fail_pending()
+                break
+            batch = self._collect_batch(item)
+            texts = [processed_text for processed_text, _ in batch]
+            try:
+                scores = self.model_builder.classify_batch(texts)
+                for (_, future), score in zip(batch, scores):
+                    future.set_result(float(score))
+            except Exception as e:
+                print(f"ERROR saat prediksi micro-batch: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+            self.batches_run += 1
+            self.requests_served += len(batch)
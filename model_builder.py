@@ -1,48 +1,338 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.preprocessing.sequence import pad_sequences
+from instrumentation import profiler
+from model_registry import model_file_key
+
+class TFLiteModel:
+    # Backend interpreter TFLite dengan antarmuka predict() yang sama seperti model Keras.
+    # Memakai ai_edge_litert jika terpasang (tanpa runtime TensorFlow penuh), selain itu tf.lite.
+    def __init__(self, model_path, num_threads=None):
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self.model_path = model_path
+        self.size_bytes = os.path.getsize(model_path)
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self._input = self.interpreter.get_input_details()[0]
+        self._output_index = self.interpreter.get_output_details()[0]['index']
+        self._input_shape = None
+        # Satu interpreter tidak aman dipakai bersamaan oleh beberapa thread
+        self._lock = threading.Lock()
+
+    def predict(self, sequences, verbose=0):
+        sequences = np.asarray(sequences, dtype=self._input['dtype'])
+        if len(sequences) == 0:
+            return np.zeros((0, 1), dtype=np.float32)
+        with self._lock:
+            # Alokasi ulang tensor hanya saat ukuran batch berubah
+            if self._input_shape != sequences.shape:
+                self.interpreter.resize_tensor_input(self._input['index'], sequences.shape)
+                self.interpreter.allocate_tensors()
+                self._input_shape = sequences.shape
+            self.interpreter.set_tensor(self._input['index'], sequences)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output_index).copy()
+
+def model_masks_padding(model):
+    # True jika token 0 (padding) di-mask (Embedding(mask_zero=True) atau layer Masking), sehingga
+    # memotong padding di belakang sequence tidak mengubah output LSTM
+    for layer in getattr(model, 'layers', []):
+        if getattr(layer, 'mask_zero', False) or layer.__class__.__name__ == 'Masking':
+            return True
+    return False
 
 class ModelBuilder:
-    def __init__(self, preprocessor, word_embedding):
+    def __init__(self, preprocessor, word_embedding, direct_call_max_batch=256, registry=None, tflite_threads=None,
+                 length_buckets=(8, 16, 32), length_bucketing=None, score_cache_size=50000):
         self.preprocessor = preprocessor
         self.word_embedding = word_embedding
         self.model = None
+        # ModelRegistry opsional: jika diisi, model dimuat sekali per proses dan dipakai bersama
+        self.registry = registry
+        # Batch berukuran <= direct_call_max_batch dijalankan lewat tf.function (tanpa overhead model.predict)
+        self.direct_call_max_batch = direct_call_max_batch
+        self._direct_fn = None
+        # Jumlah thread interpreter untuk model .tflite (None = default interpreter)
+        self.tflite_threads = tflite_threads
+        # Batch dikelompokkan per panjang token asli dan dijalankan pada panjang terpotong (bucket).
+        # length_bucketing=None: otomatis aktif hanya untuk model yang me-mask padding (hasil identik)
+        self.length_buckets = length_buckets
+        self.length_bucketing = length_bucketing
+        self._bucketing_active = False
+        # Cache skor (LRU) dengan kunci (model aktif, teks hasil preprocessing): komentar duplikat
+        # di dalam satu batch maupun antar permintaan hanya diinferensi sekali. 0 = nonaktif
+        self.score_cache_size = score_cache_size
+        self.score_cache = OrderedDict()
+        self.score_cache_hits = 0
+        self.score_cache_misses = 0
+        self._score_cache_lock = threading.Lock()
+        self._model_key = None
+        # Mode ensemble: beberapa checkpoint menilai sequence yang sama (lihat load_ensemble)
+        self.ensemble = {}
+        self.ensemble_weights = {}
+        self._ensemble_executor = None
 
     def load_model(self, model_path):
         try:
-            self.model = tf.keras.models.load_model(model_path, compile=False)
+            model_key = model_file_key(model_path)
+            if self.registry is not None:
+                self.model, self._direct_fn = self.registry.get(model_path, self._load_from_disk)
+            else:
+                self.model, self._direct_fn = self._load_from_disk(model_path)
+            self._model_key = model_key
+            if self.length_bucketing is None:
+                self._bucketing_active = model_masks_padding(self.model)
+            else:
+                self._bucketing_active = self.length_bucketing and not isinstance(self.model, TFLiteModel)
             print(f"Model berhasil dimuat dari {model_path}")
             return True
         except Exception as e:
             print(f"ERROR: Gagal memuat model dari {model_path}: {e}")
             return False
 
+    def _load_from_disk(self, model_path):
+        if model_path.endswith('.tflite'):
+            return TFLiteModel(model_path, num_threads=self.tflite_threads), None
+        # TensorFlow baru diimport saat model pertama kali dimuat agar startup aplikasi tetap ringan
+        import tensorflow as tf
+        model = tf.keras.models.load_model(model_path, compile=False)
+        return model, self._build_direct_fn(model)
+
+    def _build_direct_fn(self, model):
+        import tensorflow as tf
+        # Signature tetap (None, None) int32 sehingga graph hanya di-trace sekali untuk semua panjang bucket
+        @tf.function(input_signature=[tf.TensorSpec(shape=(None, None), dtype=tf.int32)])
+        def direct_fn(sequences):
+            return model(sequences, training=False)
+        return direct_fn
+
+    def _predict(self, sequences_padded):
+        n = len(sequences_padded)
+        if self._direct_fn is not None and n <= self.direct_call_max_batch:
+            with profiler.stage('model.forward_direct', items=n):
+                return self._direct_fn(np.asarray(sequences_padded, dtype=np.int32)).numpy()
+        if isinstance(self.model, TFLiteModel):
+            with profiler.stage('model.forward_tflite', items=n):
+                return self.model.predict(sequences_padded)
+        with profiler.stage('model.forward_predict', items=n):
+            return self.model.predict(sequences_padded, verbose=0)
+
+    @property
+    def active_model_key(self):
+        # Identitas checkpoint aktif (path absolut, mtime, ukuran; lihat model_file_key), None jika belum dimuat
+        return self._model_key
+
+    def score_cache_info(self):
+        with self._score_cache_lock:
+            lookups = self.score_cache_hits + self.score_cache_misses
+            return {
+                'hits': self.score_cache_hits,
+                'misses': self.score_cache_misses,
+                'hit_rate': self.score_cache_hits / lookups if lookups else 0.0,
+                'size': len(self.score_cache),
+                'maxsize': self.score_cache_size,
+            }
+
+    def clear_score_cache(self):
+        with self._score_cache_lock:
+            self.score_cache.clear()
+
+    def _lookup_scores(self, texts):
+        # Mengembalikan skor yang sudah ada di cache dan {teks: [posisi]} untuk teks unik yang belum ada.
+        # Duplikat di dalam batch dihitung sebagai hit karena tidak diinferensi ulang
+        scores = np.zeros(len(texts), dtype=np.float32)
+        missing = {}
+        with self._score_cache_lock:
+            for i, text in enumerate(texts):
+                key = (self._model_key, text)
+                score = self.score_cache.get(key)
+                if score is not None:
+                    self.score_cache.move_to_end(key)
+                    scores[i] = score
+                elif text in missing:
+                    missing[text].append(i)
+                else:
+                    missing[text] = [i]
+            self.score_cache_misses += len(missing)
+            self.score_cache_hits += len(texts) - len(missing)
+        return scores, missing
+
+    def _store_scores(self, texts, scores):
+        if not self.score_cache_size:
+            return
+        with self._score_cache_lock:
+            for text, score in zip(texts, scores):
+                self.score_cache[(self._model_key, text)] = float(score)
+            while len(self.score_cache) > self.score_cache_size:
+                self.score_cache.popitem(last=False)
+
+    def _predict_bucketed(self, sequences_padded):
+        sequences_padded = np.asarray(sequences_padded, dtype=np.int32)
+        max_length = sequences_padded.shape[1]
+        # Padding 'post' dan id token asli selalu > 0, jadi panjang asli = jumlah elemen bukan nol
+        lengths = np.count_nonzero(sequences_padded, axis=1)
+        bounds = [b for b in self.length_buckets if b < max_length] + [max_length]
+        scores = np.empty((len(sequences_padded), 1), dtype=np.float32)
+        lower = -1
+        for upper in bounds:
+            idx = np.flatnonzero((lengths > lower) & (lengths <= upper))
+            if len(idx):
+                with profiler.stage(f'model.bucket_{upper}', items=len(idx)):
+                    scores[idx] = self._predict(sequences_padded[idx, :upper])
+            lower = upper
+        return scores
+
     def classify_text(self, text_input):
         if self.model is None:
             raise ValueError("Model belum dimuat. Panggil load_model() dulu.")
             
         print(f"Running : {text_input[:20]}...")
-        tokens = self.preprocessor.preprocess_text(text_input)
+        with profiler.stage('preprocess.total'):
+            tokens = self.preprocessor.preprocess_text(text_input)
         text_str = ' '.join(tokens)
+
+        if self.score_cache_size:
+            cached_scores, missing = self._lookup_scores([text_str])
+            if not missing:
+                return float(cached_scores[0])
         
         sequences_padded = self.word_embedding.get_sequences([text_str])
         
         try:
-            score = self.model.predict(sequences_padded, verbose=0)
-            return float(score[0][0]) 
+            score = float(self._predict(sequences_padded)[0][0])
+            self._store_scores([text_str], [score])
+            return score
         except Exception as e:
             print(f"ERROR saat prediksi tunggal: {e}")
             return 0.0
 
-    def classify_batch(self, processed_text_list):
+    def classify_batch(self, processed_text_list, sequences_padded=None):
+        # sequences_padded opsional: hasil get_sequences untuk teks yang sama yang sudah dihitung
+        # sebelumnya (mis. oleh tahap encoder pipeline.py), sehingga tidak di-encode ulang
         if self.model is None:
             raise ValueError("Model belum dimuat. Panggil load_model() dulu.")
             
-        sequences_padded = self.word_embedding.get_sequences(processed_text_list)
-        
+        if not self.score_cache_size:
+            if sequences_padded is None:
+                sequences_padded = self.word_embedding.get_sequences(processed_text_list)
+            return self.classify_sequences(sequences_padded)
+
+        # Deduplikasi sebelum inferensi, lalu skor disebar kembali ke posisi aslinya
+        texts = list(processed_text_list)
+        scores, missing = self._lookup_scores(texts)
+        if missing:
+            unique_texts = list(missing)
+            try:
+                if sequences_padded is None:
+                    unique_sequences = self.word_embedding.get_sequences(unique_texts)
+                else:
+                    unique_sequences = np.asarray(sequences_padded)[[positions[0] for positions in missing.values()]]
+                unique_scores = self._score_sequences(unique_sequences)
+            except Exception as e:
+                print(f"ERROR saat prediksi batch: {e}")
+                return np.array([0.0] * len(texts))
+            self._store_scores(unique_texts, unique_scores)
+            for text, score in zip(unique_texts, unique_scores):
+                scores[missing[text]] = score
+        return scores
+
+    def _score_sequences(self, sequences_padded):
+        if self._bucketing_active and len(sequences_padded) > 1:
+            return self._predict_bucketed(sequences_padded).flatten()
+        return self._predict(sequences_padded).flatten()
+
+    def score_sequences(self, sequences_padded):
+        # Seperti classify_sequences, tetapi kegagalan inferensi diteruskan sebagai exception; dipakai
+        # jika skornya disimpan (mis. cache skor validasi), agar skor nol dari prediksi gagal tidak tersimpan
+        if self.model is None:
+            raise ValueError("Model belum dimuat. Panggil load_model() dulu.")
+        return self._score_sequences(sequences_padded)
+
+    def classify_sequences(self, sequences_padded):
+        if self.model is None:
+            raise ValueError("Model belum dimuat. Panggil load_model() dulu.")
+
         try:
-            scores_batch = self.model.predict(sequences_padded, verbose=0)
-            return scores_batch.flatten()
+            return self._score_sequences(sequences_padded)
         except Exception as e:
             print(f"ERROR saat prediksi batch: {e}")
-            return np.array([0.0] * len(processed_text_list))
\ No newline at end of file
+            return np.array([0.0] * len(sequences_padded))
+
+    def classify_store(self, store, batch_size=None, start=0, stop=None, progress_callback=None):
+        # Inferensi langsung dari SequenceStore (sequence_store.py) per batch view memmap:
+        # tanpa preprocessing maupun encoding teks, hanya komputasi model. Default batch mengikuti
+        # direct_call_max_batch agar setiap batch lewat tf.function (lebih cepat dari model.predict)
+        if self.model is None:
+            raise ValueError("Model belum dimuat. Panggil load_model() dulu.")
+        from sequence_store import encoding_fingerprint
+        if store.fingerprint != encoding_fingerprint(self.preprocessor, self.word_embedding):
+            raise ValueError(f"Store {store.path} dibuat dengan preprocessing/tokenizer yang berbeda")
+
+        batch_size = batch_size or (self.direct_call_max_batch if self._direct_fn is not None else 4096)
+        stop = len(store) if stop is None else min(stop, len(store))
+        scores = np.zeros(max(0, stop - start), dtype=np.float32)
+        for batch_start, batch in store.iter_batches(batch_size, start, stop):
+            offset = batch_start - start
+            scores[offset:offset + len(batch)] = self.classify_sequences(batch)
+            if progress_callback:
+                progress_callback(offset + len(batch), len(scores))
+        return scores
+
+    def load_ensemble(self, model_paths, weights=None):
+        # Setiap anggota adalah ModelBuilder sendiri (model, tf.function, bucketing, backend TFLite)
+        # yang berbagi preprocessor, tokenizer dan registry dengan builder ini
+        weights = list(weights) if weights is not None else [1.0] * len(model_paths)
+        if len(weights) != len(model_paths):
+            print("ERROR: Jumlah bobot ensemble harus sama dengan jumlah model")
+            return False
+        members = {}
+        for model_path in model_paths:
+            member = ModelBuilder(
+                self.preprocessor, self.word_embedding,
+                direct_call_max_batch=self.direct_call_max_batch, registry=self.registry,
+                tflite_threads=self.tflite_threads, length_buckets=self.length_buckets,
+                length_bucketing=self.length_bucketing, score_cache_size=0
+            )
+            if not member.load_model(model_path):
+                return False
+            members[model_path] = member
+        total_weight = float(sum(weights))
+        self.ensemble = members
+        self.ensemble_weights = {path: w / total_weight for path, w in zip(model_paths, weights)}
+        if self._ensemble_executor is not None:
+            self._ensemble_executor.shutdown(wait=False)
+        # TensorFlow/TFLite melepas GIL selama inferensi, sehingga anggota ensemble berjalan bersamaan
+        self._ensemble_executor = ThreadPoolExecutor(max_workers=len(members), thread_name_prefix='ensemble')
+        return True
+
+    def classify_ensemble_sequences(self, sequences_padded):
+        # Mengembalikan ({path model: skor}, skor gabungan = rata-rata berbobot); kegagalan inferensi
+        # salah satu anggota diteruskan sebagai exception, bukan skor nol
+        if not self.ensemble:
+            raise ValueError("Ensemble belum dimuat. Panggil load_ensemble() dulu.")
+        sequences_padded = np.asarray(sequences_padded, dtype=np.int32)
+        futures = {
+            path: self._ensemble_executor.submit(member.score_sequences, sequences_padded)
+            for path, member in self.ensemble.items()
+        }
+        with profiler.stage('model.ensemble', items=len(sequences_padded)):
+            scores = {path: np.asarray(future.result(), dtype=np.float32) for path, future in futures.items()}
+        combined = np.zeros(len(sequences_padded), dtype=np.float32)
+        for path, member_scores in scores.items():
+            combined += self.ensemble_weights[path] * member_scores
+        return scores, combined
+
+    def classify_ensemble(self, processed_text_list):
+        # Teks dideduplikasi lalu di-encode sekali untuk semua anggota ensemble
+        texts = list(processed_text_list)
+        if not texts:
+            empty = np.zeros(0, dtype=np.float32)
+            return {path: empty for path in self.ensemble}, empty
+        unique_texts, inverse = np.unique(np.asarray(texts, dtype=object), return_inverse=True)
+        scores, combined = self.classify_ensemble_sequences(self.word_embedding.get_sequences(list(unique_texts)))
+        return {path: s[inverse] for path, s in scores.items()}, combined[inverse]
@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+def estimate_model_bytes(model):
+    # Backend non-Keras (mis. TFLiteModel) melaporkan ukurannya sendiri
+    if hasattr(model, 'size_bytes'):
+        return int(model.size_bytes)
+    return int(sum(np.prod(w.shape) * np.dtype(w.dtype).itemsize for w in model.weights))
+
+def model_file_key(model_path):
+    # Identitas checkpoint: path + mtime + ukuran, sehingga file yang ditulis ulang di tempat
+    # (mis. oleh training.py) dianggap model baru
+    stat = os.stat(model_path)
+    return (os.path.abspath(model_path), stat.st_mtime_ns, stat.st_size)
+
+class ModelRegistry:
+    # Registry model tingkat proses: setiap checkpoint dimuat sekali dan dipakai bersama oleh semua sesi.
+    # Maksimal max_models model (dan memory_budget_mb) disimpan di memori, sisanya dikeluarkan secara LRU.
+    def __init__(self, max_models=4, memory_budget_mb=None):
+        self.max_models = max_models
+        self.memory_budget_mb = memory_budget_mb
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading_locks = {}
+
+    def get(self, model_path, loader):
+        key = model_file_key(model_path)
+        with self._lock:
+            value = self._touch(key)
+            if value is not None:
+                return value
+            self._evict_stale(key)
+            path_lock = self._loading_locks.setdefault(key, threading.Lock())
+
+        # Kunci per path: sesi lain yang meminta model yang sama menunggu, bukan memuat ulang
+        with path_lock:
+            with self._lock:
+                value = self._touch(key)
+                if value is not None:
+                    return value
+
+            try:
+                t_start = time.perf_counter()
+                value = loader(model_path)
+                load_time = time.perf_counter() - t_start
+
+                model = value[0] if isinstance(value, tuple) else value
+                with self._lock:
+                    self._entries[key] = {
+                        'value': value,
+                        'path': model_path,
+                        'size_bytes': estimate_model_bytes(model),
+                        'load_time_s': load_time,
+                        'loaded_at': time.time(),
+                        'last_used': time.time(),
+                        'hits': 0,
+                    }
+                    self.misses += 1
+                    self._evict(keep=key)
+            finally:
+                # Juga saat loader gagal, agar kunci untuk checkpoint yang gagal dimuat tidak tertinggal
+                with self._lock:
+                    self._loading_locks.pop(key, None)
+        print(f"Model {model_path} dimuat ke registry dalam {load_time:.2f} detik.")
+        return value
+
+    def _touch(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        entry['last_used'] = time.time()
+        entry['hits'] += 1
+        self.hits += 1
+        return entry['value']
+
+    def _total_bytes(self):
+        return sum(entry['size_bytes'] for entry in self._entries.values())
+
+    def _over_budget(self):
+        if len(self._entries) > self.max_models:
+            return True
+        if self.memory_budget_mb is not None:
+            return self._total_bytes() > self.memory_budget_mb * 1024 * 1024
+        return False
+
+    def _evict(self, keep):
+        while len(self._entries) > 1 and self._over_budget():
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            entry = self._entries.pop(key)
+            self.evictions += 1
+            print(f"Model {entry['path']} dikeluarkan dari registry (LRU).")
+
+    def _evict_stale(self, key):
+        # Versi lama dari checkpoint yang sama (mtime/ukuran berbeda) tidak boleh dipakai lagi
+        for stale_key in [k for k in self._entries if k[0] == key[0] and k != key]:
+            entry = self._entries.pop(stale_key)
+            self.evictions += 1
+            print(f"Model {entry['path']} berubah di disk, versi lama dikeluarkan dari registry.")
+
+    def evict(self, model_path):
+        path = os.path.abspath(model_path)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == path]:
+                self._entries.pop(key)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'resident': len(self._entries),
+                'max_models': self.max_models,
+                'resident_mb': self._total_bytes() / (1024 * 1024),
+                'memory_budget_mb': self.memory_budget_mb,
+                'models': [
+                    {
+                        'path': entry['path'],
+                        'size_mb': entry['size_bytes'] / (1024 * 1024),
+                        'load_time_s': entry['load_time_s'],
+                        'hits': entry['hits'],
+                        'last_used': entry['last_used'],
+                    }
+                    for entry in self._entries.values()
+                ],
+            }
@@ -0,0 +1,152 @@
+import queue
+import threading
+import time
+import numpy as np
+
+_DONE = object()
+
+class _StageError:
+    def __init__(self, stage, error):
+        self.stage = stage
+        self.error = error
+
+class ClassificationPipeline:
+    # Preprocessing (proses worker / thread feeder), encoder (WordEmbedding) dan model berjalan bersamaan,
+    # dihubungkan antrian berukuran terbatas. Tahap yang lebih cepat tertahan saat antrian berikutnya
+    # penuh (backpressure), sehingga memori tetap terbatas dan throughput mendekati tahap paling lambat.
+    #   batch_size            : baris per batch yang mengalir antar tahap (dan per hasil yang di-yield)
+    #   preprocess_chunksize  : baris per tugas worker preprocessing
+    #   model_batch_size      : baris per panggilan classify_batch di tahap model (default direct_call_max_batch
+    #                           milik ModelBuilder, agar inferensi lewat tf.function, bukan model.predict)
+    #   queue_size            : jumlah batch maksimum yang menunggu di setiap antrian
+    def __init__(self, preprocessor, model_builder, workers=1, batch_size=2000, preprocess_chunksize=500,
+                 model_batch_size=None, queue_size=4):
+        self.preprocessor = preprocessor
+        self.model_builder = model_builder
+        self.workers = workers or 1
+        self.batch_size = batch_size
+        self.preprocess_chunksize = preprocess_chunksize
+        self.model_batch_size = model_batch_size or model_builder.direct_call_max_batch
+        self.queue_size = queue_size
+        # Waktu sibuk per tahap (detik) dari run() terakhir
+        self.stage_seconds = {}
+        self._stop = threading.Event()
+
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _add_time(self, stage, t_start):
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + time.perf_counter() - t_start
+
+    def _feed(self, chunks, executor, out_q):
+        try:
+            for df_chunk in chunks:
+                for start in range(0, len(df_chunk), self.batch_size):
+                    t_start = time.perf_counter()
+                    df_batch = df_chunk.iloc[start:start + self.batch_size].reset_index(drop=True)
+                    texts = df_batch['text'].tolist()
+                    if executor is not None:
+                        pending = [
+                            self.preprocessor.submit_chunk(executor, texts[i:i + self.preprocess_chunksize])
+                            for i in range(0, len(texts), self.preprocess_chunksize)
+                        ]
+                    else:
+                        pending = [self.preprocessor.preprocess_text(text) for text in texts]
+                    self._add_time('preprocess', t_start)
+                    if not self._put(out_q, (df_batch, pending)):
+                        return
+            self._put(out_q, _DONE)
+        except Exception as e:
+            self._put(out_q, _StageError('preprocess', e))
+
+    def _encode(self, in_q, out_q, use_pool):
+        try:
+            while True:
+                item = self._get(in_q)
+                if item is _DONE or isinstance(item, _StageError):
+                    self._put(out_q, item)
+                    return
+                df_batch, pending = item
+                if use_pool:
+                    # Future dari worker pool, diambil sesuai urutan submit
+                    pending = [tokens for future in pending for tokens in self.preprocessor.collect_chunk(future)]
+                t_start = time.perf_counter()
+                processed = [" ".join(tokens) for tokens in pending]
+                sequences = self.model_builder.word_embedding.get_sequences(processed)
+                self._add_time('encode', t_start)
+                if not self._put(out_q, (df_batch, processed, sequences)):
+                    return
+        except Exception as e:
+            self._put(out_q, _StageError('encode', e))
+
+    def _infer(self, in_q, out_q):
+        try:
+            while True:
+                item = self._get(in_q)
+                if item is _DONE or isinstance(item, _StageError):
+                    self._put(out_q, item)
+                    return
+                df_batch, processed, sequences = item
+                t_start = time.perf_counter()
+                scores = np.concatenate([
+                    np.asarray(self.model_builder.classify_batch(
+                        processed[i:i + self.model_batch_size], sequences[i:i + self.model_batch_size]
+                    ), dtype=float)
+                    for i in range(0, len(processed), self.model_batch_size)
+                ]) if processed else np.zeros(0)
+                self._add_time('model', t_start)
+                df_result = df_batch.copy()
+                df_result['processed_text'] = processed
+                df_result['skor_prediksi'] = scores
+                df_result['klasifikasi'] = np.where(scores >= 0.5, "Judi Online", "Non-Judi Online")
+                if not self._put(out_q, df_result):
+                    return
+        except Exception as e:
+            self._put(out_q, _StageError('model', e))
+
+    def run(self, chunks):
+        # chunks: iterable DataFrame berkolom 'text' (mis. iter_text_chunks); hasil di-yield per batch
+        # sesuai urutan input, dengan kolom processed_text, skor_prediksi dan klasifikasi
+        self._stop.clear()
+        self.stage_seconds = {}
+        preprocess_q = queue.Queue(maxsize=self.queue_size)
+        encode_q = queue.Queue(maxsize=self.queue_size)
+        result_q = queue.Queue(maxsize=self.queue_size)
+        executor = self.preprocessor.worker_pool(self.workers) if self.workers > 1 else None
+        threads = [
+            threading.Thread(target=self._feed, args=(chunks, executor, preprocess_q), name='pipeline-preprocess', daemon=True),
+            threading.Thread(target=self._encode, args=(preprocess_q, encode_q, executor is not None), name='pipeline-encode', daemon=True),
+            threading.Thread(target=self._infer, args=(encode_q, result_q), name='pipeline-model', daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = self._get(result_q)
+                if item is _DONE:
+                    return
+                if isinstance(item, _StageError):
+                    print(f"ERROR: Tahap {item.stage} pipeline gagal: {item.error}")
+                    raise item.error
+                yield item
+        finally:
+            # Juga dijalankan jika pemanggil berhenti di tengah jalan: semua tahap dihentikan
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
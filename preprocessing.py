@@ -1,45 +1,210 @@
 import re
-import nltk
-from nltk.tokenize import wordpunct_tokenize
-from nltk.corpus import stopwords
+import hashlib
+from Sastrawi.Dictionary.ArrayDictionary import ArrayDictionary
 from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
 import json
 import os 
+import atexit
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from instrumentation import profiler
+from lexicon import LEXICON_PATH, Lexicon, build_stopwords
+
+# Naikkan jika logika preprocessing berubah agar artefak cache lama tidak dipakai lagi
+PREPROCESS_VERSION = 1
+
+# Pola regex cleansing dikompilasi sekali saat modul dimuat
+RE_MENTION_HASHTAG_URL = re.compile(r'(@\w+|#\w+|https?://\S+)')
+RE_YG = re.compile(r'(\w)yg')
+RE_NON_ALPHA = re.compile(r'[^a-zA-Z\s]')
+RE_SPACED_LETTERS = re.compile(r'\b([a-zA-Z])\s+(?=[a-zA-Z]\b)')
+RE_REPEATED_CHAR = re.compile(r'(\w)\1{1,}')
+RE_WHITESPACE = re.compile(r'\s+')
+
+class SetDictionary(ArrayDictionary):
+    # ArrayDictionary dengan lookup lewat set (O(1) per kata); words tetap list seperti aslinya sehingga
+    # API library (add, add_words, count) tetap berfungsi
+    def __init__(self, words=None):
+        self._word_set = set()
+        super().__init__(words)
+
+    def contains(self, word):
+        return word in self._word_set
+
+    def add(self, word):
+        if not word or word.strip() == '':
+            return
+        self.words.append(word)
+        self._word_set.add(word)
+
+# Preprocessor milik tiap proses worker pada preprocess_batch (dibuat sekali per worker)
+_worker_preprocessor = None
+
+def _init_worker(stem_cache_size, stem_cache, lexicon_path):
+    global _worker_preprocessor
+    # Lexicon sudah diverifikasi oleh proses induk (lihat worker_pool)
+    _worker_preprocessor = Preprocessor(stem_cache_size=stem_cache_size, lexicon_path=lexicon_path, verify_lexicon=False)
+    _worker_preprocessor.stem_cache.update(stem_cache)
+    _worker_preprocessor._new_stems = {}
+
+def _take_new_stems():
+    # Hasil stemming baru di worker sejak tugas sebelumnya, dikirim balik ke proses induk
+    new_stems = _worker_preprocessor._new_stems
+    _worker_preprocessor._new_stems = {}
+    return new_stems
+
+def _preprocess_chunk(texts):
+    return [_worker_preprocessor.preprocess_text(text) for text in texts], _take_new_stems()
+
+def _preprocess_chunk_tracked(texts):
+    return [_worker_preprocessor.preprocess_text_tracked(text) for text in texts], _take_new_stems()
 
 class Preprocessor:
-    def __init__(self):
+    def __init__(self, stem_cache_size=100000, stem_cache_path=None, lexicon_path=None, verify_lexicon=True):
         current_dir = os.path.dirname(os.path.realpath(__file__))
         kamus_path = os.path.join(current_dir, 'kamus_slang.json')
+        if lexicon_path is None:
+            lexicon_path = os.path.join(current_dir, LEXICON_PATH)
 
-        try:
-            with open(kamus_path, 'r') as f:
-                self.kamus_slang = json.load(f)
-            print("Kamus slang berhasil dimuat.")
-        except Exception as e:
-            print(f"ERROR: Gagal memuat 'kamus_slang.json' dari {kamus_path}: {e}")
-            self.kamus_slang = {}
-
-        stopwords_id = set(stopwords.words('indonesian'))
-        stopwords_en = set(stopwords.words('english'))
-        custom_stopwords = {
-            'di', 'ke', 'ya', 'eh', 'he', 'nya', 'nih', 'sih', 'si', 'tau', 'tuh',
-            'dong', 'kok', 'wow', 'om', 'kak', 'bang', 'bro', 'cici', 'kakak', 'ka'
-        }
-        self.list_stopwords_final = stopwords_id.union(stopwords_en).union(custom_stopwords)
-        self.list_stopwords_final.discard('tidak')
-        self.list_stopwords_final.discard('aku')
+        # lexicon.bin (lihat lexicon.py) dipakai jika ada dan digest sumbernya cocok dengan kamus_slang.json
+        # dan stopword tambahan saat ini; jalur ini tidak membutuhkan NLTK sama sekali
+        self.lexicon = None
+        self.lexicon_path = None
+        if os.path.exists(lexicon_path):
+            try:
+                lexicon = Lexicon(lexicon_path)
+                if not verify_lexicon or lexicon.is_current(kamus_path):
+                    self.lexicon = lexicon
+                    self.lexicon_path = lexicon_path
+                else:
+                    print(f"Lexicon {lexicon_path} usang (kamus slang / stopword berubah), tidak dipakai.")
+            except Exception as e:
+                print(f"ERROR: Gagal memuat lexicon dari {lexicon_path}: {e}")
+
+        if self.lexicon is not None:
+            # Kamus slang & stopword kecil (~3 ribu entri) disalin ke dict/set agar lookup per token
+            # tetap secepat dict; tabel stemming yang besar tetap dibaca langsung dari mmap
+            self.kamus_slang = dict(self.lexicon.slang.items())
+            self.list_stopwords_final = set(self.lexicon.stopwords)
+            self.stem_table = self.lexicon.stems
+            print(f"Lexicon berhasil dimuat dari {lexicon_path}.")
+        else:
+            try:
+                with open(kamus_path, 'r') as f:
+                    self.kamus_slang = json.load(f)
+                print("Kamus slang berhasil dimuat.")
+            except Exception as e:
+                print(f"ERROR: Gagal memuat 'kamus_slang.json' dari {kamus_path}: {e}")
+                self.kamus_slang = {}
+            self.list_stopwords_final = build_stopwords()
+            self.stem_table = None
 
         factory = StemmerFactory()
         self.stemmer = factory.create_stemmer()
+        # Kamus kata dasar Sastrawi disimpan sebagai list (pencarian O(n) per kata); stemmer diberi
+        # SetDictionary berisi kata yang sama, tanpa mengubah objek kamus milik library
+        delegated = getattr(self.stemmer, 'delegatedStemmer', None)
+        dictionary = getattr(delegated, 'dictionary', None)
+        if isinstance(dictionary, ArrayDictionary) and not isinstance(dictionary, SetDictionary):
+            delegated.dictionary = SetDictionary(dictionary.words)
+
+        # Cache kata -> kata dasar (LRU) agar Sastrawi tidak dipanggil berulang untuk kata yang sama
+        self.stem_cache_size = stem_cache_size
+        self.stem_cache_path = stem_cache_path
+        self.stem_cache = OrderedDict()
+        self.stem_cache_hits = 0
+        self.stem_cache_misses = 0
+        self._stem_cache_lock = threading.Lock()
+        # Hanya diisi di proses worker: kata -> kata dasar yang baru dihitung (lihat _take_new_stems)
+        self._new_stems = None
+        if stem_cache_path:
+            self.load_stem_cache(stem_cache_path)
+            atexit.register(self.save_stem_cache)
         print("Preprocessor (Offline) siap.")
 
+    def fingerprint(self):
+        h = hashlib.sha256()
+        h.update(str(PREPROCESS_VERSION).encode('utf-8'))
+        h.update(json.dumps(self.kamus_slang, sort_keys=True).encode('utf-8'))
+        h.update('\n'.join(sorted(self.list_stopwords_final)).encode('utf-8'))
+        return h.hexdigest()
+
+    def load_stem_cache(self, filepath):
+        if not os.path.exists(filepath):
+            return
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            with self._stem_cache_lock:
+                for word, stem in cached.items():
+                    self.stem_cache[word] = stem
+                while len(self.stem_cache) > self.stem_cache_size:
+                    self.stem_cache.popitem(last=False)
+            print(f"Cache stemming berhasil dimuat dari {filepath} ({len(self.stem_cache)} kata).")
+        except Exception as e:
+            print(f"ERROR: Gagal memuat cache stemming dari {filepath}: {e}")
+
+    def save_stem_cache(self, filepath=None):
+        filepath = filepath or self.stem_cache_path
+        if not filepath:
+            return
+        try:
+            with self._stem_cache_lock:
+                snapshot = dict(self.stem_cache)
+            tmp_path = f"{filepath}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(tmp_path, filepath)
+        except Exception as e:
+            print(f"ERROR: Gagal menyimpan cache stemming ke {filepath}: {e}")
+
+    def stem_cache_info(self):
+        return {
+            'hits': self.stem_cache_hits,
+            'misses': self.stem_cache_misses,
+            'size': len(self.stem_cache),
+            'maxsize': self.stem_cache_size,
+        }
+
+    def stem_word(self, word):
+        with self._stem_cache_lock:
+            stem = self.stem_cache.get(word)
+            if stem is not None:
+                self.stem_cache.move_to_end(word)
+                self.stem_cache_hits += 1
+                return stem
+            self.stem_cache_misses += 1
+        stem = self.stem_table.get(word) if self.stem_table is not None else None
+        if stem is None:
+            stem = self.stemmer.stem(word)
+        with self._stem_cache_lock:
+            self.stem_cache[word] = stem
+            if len(self.stem_cache) > self.stem_cache_size:
+                self.stem_cache.popitem(last=False)
+            if self._new_stems is not None:
+                self._new_stems[word] = stem
+        return stem
+
+    def merge_stems(self, new_stems):
+        # Menggabungkan hasil stemming dari worker pool ke cache LRU proses ini
+        if not new_stems:
+            return
+        with self._stem_cache_lock:
+            for word, stem in new_stems.items():
+                self.stem_cache[word] = stem
+                self.stem_cache.move_to_end(word)
+            while len(self.stem_cache) > self.stem_cache_size:
+                self.stem_cache.popitem(last=False)
+
     def cleanse(self, text):
-        text = re.sub(r'(@\w+|#\w+|https?://\S+)', '', text)
-        text = re.sub(r'(\w)yg', r'\1 yang', text)
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
-        text = re.sub(r'\b([a-zA-Z])\s+(?=[a-zA-Z]\b)', r'\1', text)
-        text = re.sub(r'(\w)\1{1,}', r'\1', text)
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = RE_MENTION_HASHTAG_URL.sub('', text)
+        text = RE_YG.sub(r'\1 yang', text)
+        text = RE_NON_ALPHA.sub('', text)
+        text = RE_SPACED_LETTERS.sub(r'\1', text)
+        text = RE_REPEATED_CHAR.sub(r'\1', text)
+        text = RE_WHITESPACE.sub(' ', text).strip()
         return text
 
     def normalize_slang(self, tokens):
@@ -54,15 +219,103 @@ class Preprocessor:
     def stem_tokens(self, tokens):
         if not tokens:
             return []
-        return [self.stemmer.stem(word) for word in tokens]
+        return [self.stem_word(word) for word in tokens]
+
+    def _preprocess_text_staged(self, text):
+        # Jalur bertahap (setara dengan jalur gabungan) agar waktu tiap tahap bisa diukur profiler
+        with profiler.stage('preprocess.cleanse'):
+            text_clean = self.cleanse(text.lower())
+        with profiler.stage('preprocess.tokenize'):
+            tokens = text_clean.split()
+        with profiler.stage('preprocess.normalize_slang'):
+            tokens_normalized = self.normalize_slang(tokens)
+        with profiler.stage('preprocess.remove_stopwords'):
+            tokens_stopped = self.remove_stopwords(tokens_normalized)
+        with profiler.stage('preprocess.filter_length'):
+            tokens_filtered = self.filter_length(tokens_stopped)
+        with profiler.stage('preprocess.stem', items=len(tokens_filtered)):
+            return self.stem_tokens(tokens_filtered)
+
+    def _preprocess_fused(self, text, dependencies=None):
+        text_clean = self.cleanse(text.lower())
+        # Setelah cleanse teks hanya berisi huruf dan spasi tunggal, sehingga split() setara dengan
+        # wordpunct_tokenize. Normalisasi slang, stopword, filter panjang dan stemming digabung
+        # dalam satu loop (hasil sama dengan menjalankan normalize_slang -> remove_stopwords ->
+        # filter_length -> stem_tokens secara berurutan).
+        # dependencies (opsional): diisi kata yang dicari di kamus slang (token mentah) dan di daftar
+        # stopword (token hasil normalisasi)
+        kamus_slang = self.kamus_slang
+        list_stopwords = self.list_stopwords_final
+        tokens_stemmed = []
+        for raw_word in text_clean.split():
+            word = kamus_slang.get(raw_word, raw_word)
+            if dependencies is not None:
+                dependencies.add(raw_word)
+                dependencies.add(word)
+            if word in list_stopwords or len(word) <= 1:
+                continue
+            tokens_stemmed.append(self.stem_word(word))
+        return tokens_stemmed
 
     def preprocess_text(self, text):
         if not isinstance(text, str):
             return []
-        text_clean = self.cleanse(text.lower())
-        tokens = wordpunct_tokenize(text_clean)
-        tokens_normalized = self.normalize_slang(tokens)
-        tokens_stopped = self.remove_stopwords(tokens_normalized)
-        tokens_filtered = self.filter_length(tokens_stopped)
-        tokens_stemmed = self.stem_tokens(tokens_filtered)
-        return tokens_stemmed
\ No newline at end of file
+        if profiler.enabled:
+            return self._preprocess_text_staged(text)
+        return self._preprocess_fused(text)
+
+    def preprocess_text_tracked(self, text):
+        # Sama dengan preprocess_text, ditambah kata-kata yang membuat hasil preprocessing bergantung
+        # pada isi kamus_slang.json / stopword (lihat _preprocess_fused)
+        if not isinstance(text, str):
+            return [], set()
+        dependencies = set()
+        return self._preprocess_fused(text, dependencies), dependencies
+
+    def worker_pool(self, workers):
+        # 'spawn' dipakai agar worker tidak mewarisi state TensorFlow/Streamlit dari proses utama.
+        # Worker membuka lexicon yang sama (mmap, halaman dibagi lewat page cache OS); '' = tanpa lexicon
+        with self._stem_cache_lock:
+            stem_cache = dict(self.stem_cache)
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.stem_cache_size, stem_cache, self.lexicon_path or '')
+        )
+
+    def submit_chunk(self, executor, texts):
+        # Preprocessing satu potongan teks di pool dari worker_pool(); ambil hasilnya dengan collect_chunk()
+        return executor.submit(_preprocess_chunk, list(texts))
+
+    def collect_chunk(self, future):
+        # List token per teks; kata dasar yang baru dihitung worker ikut masuk ke cache stemming proses ini
+        results, new_stems = future.result()
+        self.merge_stems(new_stems)
+        return results
+
+    def preprocess_batch(self, texts, workers=None, chunksize=500, progress_callback=None, track_dependencies=False):
+        # track_dependencies=True: setiap hasil berupa (tokens, set kata kamus/stopword yang disentuh)
+        preprocess_fn = self.preprocess_text_tracked if track_dependencies else self.preprocess_text
+        texts = list(texts)
+        total = len(texts)
+        workers = workers or os.cpu_count() or 1
+        chunks = [texts[i:i + chunksize] for i in range(0, total, chunksize)]
+
+        results = []
+        if workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                results.extend(preprocess_fn(text) for text in chunk)
+                if progress_callback:
+                    progress_callback(len(results), total)
+            return results
+
+        with self.worker_pool(min(workers, len(chunks))) as executor:
+            # executor.map mengembalikan hasil sesuai urutan input, per chunk yang selesai
+            chunk_fn = _preprocess_chunk_tracked if track_dependencies else _preprocess_chunk
+            for chunk_result, new_stems in executor.map(chunk_fn, chunks):
+                self.merge_stems(new_stems)
+                results.extend(chunk_result)
+                if progress_callback:
+                    progress_callback(len(results), total)
+        return results
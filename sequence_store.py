@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import numpy as np
+from artifact_cache import hash_key
+
+SEQUENCE_DTYPE = np.int32
+STORE_VERSION = 1
+
+def metadata_path(path):
+    return f"{path}.json"
+
+def encoding_fingerprint(preprocessor, word_embedding):
+    # Isi vocabulary (bukan hash file) dipakai agar tokenizer.json dan tokenizer.npz yang setara
+    # menghasilkan fingerprint yang sama
+    vocab = word_embedding.vocab
+    if vocab is None:
+        raise ValueError("Tokenizer belum dimuat. Panggil load_tokenizer() dulu.")
+    return hash_key(
+        preprocessor.fingerprint(),
+        json.dumps(sorted(vocab.word_to_id.items()), ensure_ascii=False),
+        vocab.oov_id, vocab.filters, vocab.lower, vocab.split,
+        word_embedding.config['max_length']
+    )
+
+def _load_metadata(path):
+    with open(metadata_path(path), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('version') != STORE_VERSION:
+        raise ValueError(f"Versi store {meta.get('version')} tidak didukung (butuh {STORE_VERSION})")
+    return meta
+
+def _save_metadata(path, meta):
+    tmp_path = f"{metadata_path(path)}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, metadata_path(path))
+
+def append_to_store(path, text_chunks, preprocessor, word_embedding, source, workers=None, progress_callback=None,
+                    preprocess_chunksize=500):
+    # Hasil get_sequences ditulis berurutan ke file biner int32 (n, max_length); sidecar JSON berisi
+    # jumlah baris, fingerprint preprocessing/tokenizer dan segmen (sumber, baris awal, jumlah baris)
+    fingerprint = encoding_fingerprint(preprocessor, word_embedding)
+    max_length = word_embedding.config['max_length']
+    if os.path.exists(metadata_path(path)):
+        meta = _load_metadata(path)
+        if meta['fingerprint'] != fingerprint:
+            raise ValueError(
+                f"Store {path} dibuat dengan preprocessing/tokenizer yang berbeda; buat store baru untuk tokenizer ini"
+            )
+    else:
+        meta = {
+            'version': STORE_VERSION,
+            'dtype': np.dtype(SEQUENCE_DTYPE).str,
+            'max_length': max_length,
+            'rows': 0,
+            'fingerprint': fingerprint,
+            'segments': [],
+        }
+
+    row_bytes = max_length * np.dtype(SEQUENCE_DTYPE).itemsize
+    start = meta['rows']
+    rows = start
+    buffer = None
+    workers = workers or os.cpu_count() or 1
+    # Satu worker pool untuk seluruh append: Sastrawi hanya dibangun sekali per worker, bukan per chunk
+    executor = preprocessor.worker_pool(workers) if workers > 1 else None
+    try:
+        with open(path, 'ab') as f:
+            # Sisa tulisan append yang terputus (di luar jumlah baris di sidecar) dibuang
+            f.truncate(start * row_bytes)
+            for chunk in text_chunks:
+                texts = list(chunk['text'] if hasattr(chunk, 'columns') else chunk)
+                if executor is not None:
+                    futures = [
+                        preprocessor.submit_chunk(executor, texts[i:i + preprocess_chunksize])
+                        for i in range(0, len(texts), preprocess_chunksize)
+                    ]
+                    tokens = [t for future in futures for t in preprocessor.collect_chunk(future)]
+                else:
+                    tokens = [preprocessor.preprocess_text(text) for text in texts]
+                processed = [" ".join(t) for t in tokens]
+                if buffer is None or len(buffer) < len(processed):
+                    buffer = np.zeros((len(processed), max_length), dtype=SEQUENCE_DTYPE)
+                sequences = word_embedding.get_sequences(processed, out=buffer)
+                f.write(sequences.tobytes())
+                rows += len(sequences)
+                if progress_callback:
+                    progress_callback(rows - start)
+            f.flush()
+            os.fsync(f.fileno())
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    meta['rows'] = rows
+    meta['segments'].append({'source': source, 'start': start, 'rows': rows - start})
+    # Sidecar ditulis terakhir: baris baru baru terlihat setelah seluruh datanya ada di disk
+    _save_metadata(path, meta)
+    print(f"{rows - start} baris dari {source} ditambahkan ke {path} (total {rows} baris)")
+    return SequenceStore(path)
+
+class SequenceStore:
+    def __init__(self, path):
+        self.path = path
+        self.meta = _load_metadata(path)
+        self.rows = self.meta['rows']
+        self.max_length = self.meta['max_length']
+        if self.rows:
+            self.sequences = np.memmap(
+                path, dtype=np.dtype(self.meta['dtype']), mode='r', shape=(self.rows, self.max_length)
+            )
+        else:
+            self.sequences = np.zeros((0, self.max_length), dtype=SEQUENCE_DTYPE)
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def fingerprint(self):
+        return self.meta['fingerprint']
+
+    @property
+    def segments(self):
+        return self.meta['segments']
+
+    def segment_range(self, source):
+        for segment in self.segments:
+            if segment['source'] == source:
+                return segment['start'], segment['start'] + segment['rows']
+        raise KeyError(f"Segmen {source} tidak ada di {self.path}")
+
+    def iter_batches(self, batch_size, start=0, stop=None):
+        # Setiap batch adalah view dari memmap (tanpa salinan); halaman dibaca OS saat dibutuhkan
+        stop = self.rows if stop is None else min(stop, self.rows)
+        for batch_start in range(start, stop, batch_size):
+            yield batch_start, self.sequences[batch_start:min(batch_start + batch_size, stop)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Store sequence (int32, memory-mapped) untuk arsip komentar")
+    parser.add_argument('command', choices=['append', 'score', 'info'])
+    parser.add_argument('store', help="Path file store, mis. arsip.seq (sidecar: arsip.seq.json)")
+    parser.add_argument('input', nargs='?', help="Untuk 'append': file .csv (kolom 'text') atau .txt")
+    parser.add_argument('--source', help="Nama segmen untuk 'append' (default: nama file input)")
+    parser.add_argument('--segment', help="Untuk 'score': hanya skor segmen ini")
+    parser.add_argument('--model', help="Untuk 'score': path model .h5/.tflite")
+    parser.add_argument('--output', help="Untuk 'score': simpan skor ke file .npy")
+    parser.add_argument('--tokenizer', default='tokenizer.json')
+    parser.add_argument('--batch-size', type=int, help="Baris per batch inferensi (default: direct_call_max_batch)")
+    parser.add_argument('--chunk-rows', type=int, default=20000)
+    parser.add_argument('--workers', type=int, help="Jumlah proses untuk preprocessing")
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        store = SequenceStore(args.store)
+        print(f"{args.store}: {len(store)} baris x {store.max_length} ({store.meta['dtype']})")
+        for segment in store.segments:
+            print(f"  {segment['source']}: baris {segment['start']}..{segment['start'] + segment['rows']}")
+        return
+
+    from preprocessing import Preprocessor
+    from word_embedding import WordEmbedding
+    word_embedding = WordEmbedding()
+    word_embedding.load_tokenizer(args.tokenizer)
+    preprocessor = Preprocessor()
+
+    if args.command == 'append':
+        from stream_classifier import iter_text_chunks
+        if not args.input:
+            parser.error("'append' membutuhkan file input")
+        with open(args.input, 'rb') as f:
+            chunks = iter_text_chunks(f, args.input, chunk_rows=args.chunk_rows)
+            append_to_store(
+                args.store, chunks, preprocessor, word_embedding,
+                args.source or os.path.basename(args.input), workers=args.workers
+            )
+        return
+
+    from model_builder import ModelBuilder
+    if not args.model:
+        parser.error("'score' membutuhkan --model")
+    store = SequenceStore(args.store)
+    model_builder = ModelBuilder(preprocessor, word_embedding)
+    if not model_builder.load_model(args.model):
+        raise SystemExit(1)
+    start, stop = store.segment_range(args.segment) if args.segment else (0, len(store))
+    try:
+        scores = model_builder.classify_store(store, batch_size=args.batch_size, start=start, stop=stop)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        raise SystemExit(1)
+    n_judi = int((scores >= 0.5).sum())
+    print(f"{len(scores)} baris diskor | Judi Online: {n_judi} | Non-Judi: {len(scores) - n_judi}")
+    if args.output:
+        np.save(args.output, scores)
+        print(f"Skor disimpan ke {args.output}")
+
+if __name__ == "__main__":
+    main()
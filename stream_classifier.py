@@ -0,0 +1,45 @@
+import io
+import numpy as np
+import pandas as pd
+from pipeline import ClassificationPipeline
+
+def iter_text_chunks(fileobj, filename, chunk_rows=5000):
+    # Membaca file unggahan per potongan (chunk) sehingga memori tidak bergantung pada ukuran file
+    if filename.endswith('.csv'):
+        for chunk in pd.read_csv(fileobj, chunksize=chunk_rows):
+            if 'text' not in chunk.columns:
+                raise ValueError("File CSV harus memiliki kolom 'text'.")
+            yield chunk.reset_index(drop=True)
+    else:
+        reader = io.TextIOWrapper(fileobj, encoding='utf-8', newline='')
+        lines = []
+        for line in reader:
+            lines.append(line.rstrip('\r\n'))
+            if len(lines) == chunk_rows:
+                yield pd.DataFrame(lines, columns=['text'])
+                lines = []
+        if lines:
+            yield pd.DataFrame(lines, columns=['text'])
+        # Jangan biarkan TextIOWrapper menutup file milik pemanggil saat di-garbage-collect
+        reader.detach()
+
+def classify_chunk(df_chunk, preprocessor, model_builder, workers=1):
+    processed_tokens = preprocessor.preprocess_batch(df_chunk['text'], workers=workers)
+    df_result = df_chunk.copy()
+    df_result['processed_text'] = [" ".join(tokens) for tokens in processed_tokens]
+    scores = np.asarray(model_builder.classify_batch(df_result['processed_text']), dtype=float)
+    df_result['skor_prediksi'] = scores
+    df_result['klasifikasi'] = np.where(scores >= 0.5, "Judi Online", "Non-Judi Online")
+    return df_result
+
+def classify_stream(chunks, preprocessor, model_builder, output_path, workers=1, **pipeline_options):
+    # chunk -> preprocessing -> encoding -> inferensi -> ditulis bertahap ke output_path (CSV).
+    # Tahap-tahap berjalan bersamaan lewat ClassificationPipeline; hasil di-yield per batch sesuai urutan
+    pipeline = ClassificationPipeline(preprocessor, model_builder, workers=workers, **pipeline_options)
+    rows_done = 0
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        for i, df_result in enumerate(pipeline.run(chunks)):
+            df_result.to_csv(f, header=(i == 0), index=False)
+            f.flush()
+            rows_done += len(df_result)
+            yield df_result, rows_done
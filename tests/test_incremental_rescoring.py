@@ -0,0 +1,61 @@
+import os
+import zlib
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import REPO_DIR
+from incremental_rescoring import ScoredCorpus
+from preprocessing import Preprocessor
+
+class FakeModelBuilder:
+    # Skor deterministik dari teks hasil preprocessing (pengganti model), sehingga perubahan teks
+    # langsung terlihat pada skor
+    active_model_key = ('fake.h5', 1, 1)
+
+    def classify_batch(self, processed_text_list):
+        return np.array([zlib.crc32(text.encode('utf-8')) / 2 ** 32 for text in processed_text_list], dtype=np.float32)
+
+@pytest.fixture(scope='module')
+def texts():
+    return pd.read_csv(os.path.join(REPO_DIR, 'data_validasi_mentah.csv'))['text'].tolist()[:400] + [None, '']
+
+def edit_lexicon(preprocessor, corpus):
+    # Kata yang benar-benar muncul di korpus: satu kunci slang diubah, satu slang baru, satu stopword
+    # dihapus dan satu kata biasa dijadikan stopword
+    slang_key = next(word for word in corpus.words if word in preprocessor.kamus_slang)
+    preprocessor.kamus_slang[slang_key] = 'judi'
+    plain = [word for word in corpus.words
+             if word not in preprocessor.kamus_slang and word not in preprocessor.list_stopwords_final and len(word) > 2]
+    preprocessor.kamus_slang[plain[0]] = 'slot'
+    preprocessor.list_stopwords_final.add(plain[1])
+    preprocessor.list_stopwords_final.discard(next(word for word in corpus.words if word in preprocessor.list_stopwords_final))
+
+def test_update_matches_full_rebuild(texts, tmp_path):
+    model_builder = FakeModelBuilder()
+    preprocessor = Preprocessor(lexicon_path='')
+    corpus = ScoredCorpus.build(texts, preprocessor, model_builder, workers=1)
+    edit_lexicon(preprocessor, corpus)
+
+    stats = corpus.update(preprocessor, model_builder, workers=1)
+    assert 0 < stats['reprocessed'] < len(texts)
+    assert stats['processed_changed'] > 0
+    rebuilt = ScoredCorpus.build(texts, preprocessor, model_builder, workers=1)
+    assert corpus.processed == rebuilt.processed
+    assert np.array_equal(corpus.scores, rebuilt.scores)
+    assert corpus.lexicon == rebuilt.lexicon
+
+    # Indeks terbalik juga setara: setiap kata menunjuk ke komentar yang sama
+    for word in rebuilt.words:
+        assert np.array_equal(corpus.affected_ids([word]), rebuilt.affected_ids([word]))
+
+    # Store yang disimpan ulang memberi hasil yang sama setelah dimuat
+    loaded = ScoredCorpus.load(corpus.save(str(tmp_path / 'corpus.npz')))
+    assert loaded.processed == rebuilt.processed
+    assert np.array_equal(loaded.scores, rebuilt.scores)
+
+def test_model_change_rescores_everything(texts):
+    model_builder = FakeModelBuilder()
+    preprocessor = Preprocessor(lexicon_path='')
+    corpus = ScoredCorpus.build(texts, preprocessor, model_builder, workers=1)
+    model_builder.active_model_key = ('fake.h5', 2, 1)
+    assert corpus.update(preprocessor, model_builder, workers=1)['rescored'] == len(texts)
@@ -0,0 +1,60 @@
+import http.client
+import json
+import threading
+import time
+import pytest
+from inference_server import LatencyHistogram, create_server
+
+class FakeService:
+    # Pengganti InferenceService tanpa model: skor tetap, cukup untuk menguji validasi dan antrian server
+    model_path = 'fake.h5'
+
+    def __init__(self):
+        self.latency = {'/classify': LatencyHistogram(), '/classify_batch': LatencyHistogram()}
+        self.errors = 0
+
+    def record_error(self, path):
+        self.errors += 1
+
+    def classify(self, text):
+        return 0.9
+
+    def classify_batch(self, texts):
+        return [0.9] * len(texts)
+
+@pytest.fixture
+def server():
+    server = create_server(FakeService(), port=0, workers=2, max_pending=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def post(server, path, body):
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1])
+    conn.request('POST', path, body)
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+@pytest.mark.parametrize('path, body', [
+    ('/classify', '[1, 2]'),
+    ('/classify', '"teks"'),
+    ('/classify_batch', 'null'),
+    ('/classify_batch', '{"texts": ["teks", 3]}'),
+    ('/classify_batch', '{"texts": "teks"}'),
+])
+def test_invalid_payload_returns_400(server, path, body):
+    status, response = post(server, path, body)
+    assert status == 400
+    assert 'error' in response
+
+def test_valid_requests_release_slots(server):
+    for _ in range(10):
+        assert post(server, '/classify_batch', '{"texts": ["a", "b"]}')[0] == 200
+    assert post(server, '/classify', '{"text": "a"}') == (200, {'score': 0.9, 'klasifikasi': 'Judi Online'})
+    # Semua slot (workers + max_pending) kembali setelah koneksi ditutup worker
+    deadline = time.monotonic() + 5
+    while server._slots._value < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert server._slots._value == 3
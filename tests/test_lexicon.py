@@ -0,0 +1,55 @@
+import json
+import os
+import shutil
+import pytest
+import lexicon
+from conftest import REPO_DIR
+from lexicon import Lexicon, build_lexicon, lexicon_is_current
+from preprocessing import Preprocessor
+
+@pytest.fixture
+def built(tmp_path):
+    kamus_path = tmp_path / 'kamus_slang.json'
+    shutil.copy(os.path.join(REPO_DIR, 'kamus_slang.json'), kamus_path)
+    lexicon_path = tmp_path / 'lexicon.bin'
+    build_lexicon(str(lexicon_path), str(kamus_path))
+    return str(lexicon_path), str(kamus_path)
+
+def test_fresh_lexicon_is_used(built):
+    lexicon_path, kamus_path = built
+    assert lexicon_is_current(lexicon_path, kamus_path)
+    assert Preprocessor(lexicon_path=lexicon_path).lexicon is not None
+
+def test_kamus_edit_with_older_mtime_invalidates(built):
+    lexicon_path, kamus_path = built
+    with open(kamus_path, 'r') as f:
+        kamus_slang = json.load(f)
+    kamus_slang['zzslang'] = 'judi'
+    with open(kamus_path, 'w') as f:
+        json.dump(kamus_slang, f)
+    # Kamus yang disalin / dipulihkan dengan mtime lama tetap terdeteksi berubah
+    mtime = os.path.getmtime(lexicon_path) - 3600
+    os.utime(kamus_path, (mtime, mtime))
+
+    assert not lexicon_is_current(lexicon_path, kamus_path)
+
+def test_stopword_constants_invalidate(built, monkeypatch):
+    lexicon_path, kamus_path = built
+    monkeypatch.setattr(lexicon, 'CUSTOM_STOPWORDS', lexicon.CUSTOM_STOPWORDS | {'gan'})
+    assert not Lexicon(lexicon_path).is_current(kamus_path)
+
+def test_runtime_check_does_not_need_nltk(built, monkeypatch):
+    lexicon_path, kamus_path = built
+
+    def no_nltk():
+        raise AssertionError("build_stopwords tidak boleh dipanggil saat runtime")
+    monkeypatch.setattr(lexicon, 'build_stopwords', no_nltk)
+    assert Lexicon(lexicon_path).is_current(kamus_path)
+    assert Preprocessor(lexicon_path=lexicon_path).lexicon is not None
+
+def test_nltk_stopwords_invalidate_with_check(built, monkeypatch):
+    lexicon_path, kamus_path = built
+    assert Lexicon(lexicon_path).is_current(kamus_path, check_nltk=True)
+    monkeypatch.setattr(lexicon, 'build_stopwords', lambda: {'yang', 'dan'})
+    assert Lexicon(lexicon_path).is_current(kamus_path)
+    assert not Lexicon(lexicon_path).is_current(kamus_path, check_nltk=True)
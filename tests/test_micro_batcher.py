@@ -0,0 +1,62 @@
+import threading
+import pytest
+from micro_batcher import MicroBatcher
+
+class FakePreprocessor:
+    def preprocess_text(self, text):
+        return text.split()
+
+class FakeModelBuilder:
+    # Skor = jumlah kata, cukup untuk memeriksa bahwa setiap Future menerima hasil teksnya sendiri
+    preprocessor = FakePreprocessor()
+
+    def classify_batch(self, texts):
+        return [float(len(text.split())) for text in texts]
+
+def test_concurrent_submits_resolve():
+    batcher = MicroBatcher(FakeModelBuilder(), max_batch_size=8, max_wait_ms=2)
+    results = {}
+
+    def client(i):
+        results[i] = batcher.classify_text(' '.join(['kata'] * (i % 5 + 1)), timeout=5)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(64)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+    assert results == {i: float(i % 5 + 1) for i in range(64)}
+    assert batcher.stats()['requests_served'] == 64
+
+def test_submit_after_close_raises():
+    batcher = MicroBatcher(FakeModelBuilder())
+    batcher.close()
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit('teks')
+
+def test_submit_racing_close_never_hangs():
+    for _ in range(20):
+        batcher = MicroBatcher(FakeModelBuilder(), max_wait_ms=1)
+        futures, rejected = [], []
+        start = threading.Event()
+
+        def client():
+            start.wait()
+            for _ in range(50):
+                try:
+                    futures.append(batcher.submit('a b'))
+                except RuntimeError:
+                    rejected.append(1)
+
+        threads = [threading.Thread(target=client) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        batcher.close()
+        for thread in threads:
+            thread.join()
+        # Setiap permintaan yang diterima sebelum close selesai diproses; sisanya ditolak
+        assert all(future.result(timeout=5) == 2.0 for future in futures)
+        assert len(futures) + len(rejected) == 200
@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from model_builder import ModelBuilder
+
+class FailingModel:
+    # Model palsu yang selalu gagal saat inferensi (mis. OOM)
+    weights = []
+
+    def predict(self, sequences, verbose=0):
+        raise MemoryError("OOM")
+
+class ConstantModel:
+    weights = []
+
+    def predict(self, sequences, verbose=0):
+        return np.full((len(sequences), 1), 0.75, dtype=np.float32)
+
+def builder_with(model):
+    builder = ModelBuilder(preprocessor=None, word_embedding=None, score_cache_size=0)
+    builder.model = model
+    return builder
+
+def test_score_sequences_raises_on_failed_inference():
+    sequences = np.ones((3, 5), dtype=np.int32)
+    builder = builder_with(FailingModel())
+    with pytest.raises(MemoryError):
+        builder.score_sequences(sequences)
+    # classify_sequences tetap memakai fallback skor nol
+    assert np.array_equal(builder.classify_sequences(sequences), np.zeros(3))
+
+def test_ensemble_propagates_member_failure():
+    sequences = np.ones((3, 5), dtype=np.int32)
+    builder = builder_with(None)
+    builder.ensemble = {'ok.h5': builder_with(ConstantModel()), 'gagal.h5': builder_with(FailingModel())}
+    builder.ensemble_weights = {'ok.h5': 0.5, 'gagal.h5': 0.5}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        builder._ensemble_executor = executor
+        with pytest.raises(MemoryError):
+            builder.classify_ensemble_sequences(sequences)
+        del builder.ensemble['gagal.h5']
+        builder.ensemble_weights = {'ok.h5': 1.0}
+        scores, combined = builder.classify_ensemble_sequences(sequences)
+    assert np.allclose(combined, 0.75)
@@ -0,0 +1,53 @@
+import os
+import pytest
+from model_registry import ModelRegistry
+
+class FakeModel:
+    def __init__(self, content):
+        self.content = content
+        self.size_bytes = len(content)
+
+def load_fake(path):
+    with open(path, 'rb') as f:
+        return FakeModel(f.read()), None
+
+def test_rewritten_checkpoint_is_reloaded(tmp_path):
+    path = tmp_path / 'model 1.h5'
+    path.write_bytes(b'lama')
+    registry = ModelRegistry(max_models=4)
+    assert registry.get(str(path), load_fake)[0].content == b'lama'
+    assert registry.get(str(path), load_fake)[0].content == b'lama'
+
+    path.write_bytes(b'baru!')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert registry.get(str(path), load_fake)[0].content == b'baru!'
+
+    stats = registry.stats()
+    assert stats['resident'] == 1
+    assert stats['misses'] == 2
+    assert stats['evictions'] == 1
+
+def test_evict_removes_all_versions(tmp_path):
+    path = tmp_path / 'model 2.h5'
+    path.write_bytes(b'x')
+    registry = ModelRegistry()
+    registry.get(str(path), load_fake)
+    registry.evict(str(path))
+    assert registry.stats()['resident'] == 0
+
+def test_failed_load_leaves_no_loading_lock(tmp_path):
+    path = tmp_path / 'model 2.h5'
+    path.write_bytes(b'rusak')
+    registry = ModelRegistry(max_models=4)
+
+    def broken_loader(model_path):
+        raise OSError("file rusak")
+
+    with pytest.raises(OSError):
+        registry.get(str(path), broken_loader)
+    assert registry._loading_locks == {}
+    assert registry.stats()['resident'] == 0
+    # Percobaan berikutnya tetap bisa memuat checkpoint yang sama
+    assert registry.get(str(path), load_fake)[0].content == b'rusak'
+    assert registry._loading_locks == {}
@@ -0,0 +1,100 @@
+import json
+import os
+import re
+import pandas as pd
+import pytest
+from conftest import REPO_DIR
+from preprocessing import Preprocessor
+
+nltk = pytest.importorskip('nltk')
+from nltk.tokenize import wordpunct_tokenize
+
+CSV_FILES = ['data_validasi_mentah.csv', 'dataset_judol_BALANCED_19k.csv']
+
+def reference_stopwords():
+    # Sama dengan Preprocessor.__init__ sebelum lexicon.bin: NLTK id + en + stopword tambahan
+    from nltk.corpus import stopwords
+    try:
+        stopwords_final = set(stopwords.words('indonesian')).union(stopwords.words('english'))
+    except LookupError:
+        pytest.skip("Korpus stopwords NLTK belum diunduh")
+    stopwords_final |= {
+        'di', 'ke', 'ya', 'eh', 'he', 'nya', 'nih', 'sih', 'si', 'tau', 'tuh',
+        'dong', 'kok', 'wow', 'om', 'kak', 'bang', 'bro', 'cici', 'kakak', 'ka'
+    }
+    stopwords_final.discard('tidak')
+    stopwords_final.discard('aku')
+    return stopwords_final
+
+class ReferencePreprocessor:
+    # Implementasi awal: regex tanpa kompilasi, wordpunct_tokenize, lalu setiap tahap sebagai pass terpisah
+    def __init__(self, kamus_slang, stemmer):
+        self.kamus_slang = kamus_slang
+        self.list_stopwords_final = reference_stopwords()
+        self.stemmer = stemmer
+        self._stems = {}
+
+    def cleanse(self, text):
+        text = re.sub(r'(@\w+|#\w+|https?://\S+)', '', text)
+        text = re.sub(r'(\w)yg', r'\1 yang', text)
+        text = re.sub(r'[^a-zA-Z\s]', '', text)
+        text = re.sub(r'\b([a-zA-Z])\s+(?=[a-zA-Z]\b)', r'\1', text)
+        text = re.sub(r'(\w)\1{1,}', r'\1', text)
+        text = re.sub(r'\s+', ' ', text).strip()
+        return text
+
+    def stem(self, word):
+        # Memo murni agar 19 ribu baris tidak memanggil Sastrawi berulang untuk kata yang sama
+        if word not in self._stems:
+            self._stems[word] = self.stemmer.stem(word)
+        return self._stems[word]
+
+    def preprocess_text(self, text):
+        if not isinstance(text, str):
+            return []
+        tokens = wordpunct_tokenize(self.cleanse(text.lower()))
+        tokens = [self.kamus_slang.get(word, word) for word in tokens]
+        tokens = [word for word in tokens if word not in self.list_stopwords_final]
+        tokens = [word for word in tokens if len(word) > 1]
+        return [self.stem(word) for word in tokens]
+
+@pytest.fixture(scope='module')
+def preprocessor():
+    return Preprocessor()
+
+@pytest.fixture(scope='module')
+def reference(preprocessor):
+    with open(os.path.join(REPO_DIR, 'kamus_slang.json'), 'r') as f:
+        kamus_slang = json.load(f)
+    return ReferencePreprocessor(kamus_slang, preprocessor.stemmer)
+
+def load_texts(filename):
+    return pd.read_csv(os.path.join(REPO_DIR, filename))['text'].tolist() + [None, float('nan'), '']
+
+def test_lexicon_matches_reference(preprocessor, reference):
+    assert preprocessor.kamus_slang == reference.kamus_slang
+    assert preprocessor.list_stopwords_final == reference.list_stopwords_final
+
+@pytest.mark.parametrize('filename', CSV_FILES)
+def test_fused_path_matches_reference(preprocessor, reference, filename):
+    texts = load_texts(filename)
+    expected = [reference.preprocess_text(text) for text in texts]
+    assert [preprocessor.preprocess_text(text) for text in texts] == expected
+    assert preprocessor.preprocess_batch(texts, workers=1) == expected
+
+@pytest.mark.parametrize('filename', CSV_FILES)
+def test_staged_and_tracked_paths_match_fused(preprocessor, filename):
+    texts = load_texts(filename)
+    fused = [preprocessor.preprocess_text(text) for text in texts]
+    staged = [preprocessor._preprocess_text_staged(text) if isinstance(text, str) else [] for text in texts]
+    tracked = [preprocessor.preprocess_text_tracked(text)[0] for text in texts]
+    assert staged == fused
+    assert tracked == fused
+
+def test_tracked_dependencies_cover_lexicon_lookups(preprocessor):
+    slang_word, normalized = next(
+        (k, v) for k, v in preprocessor.kamus_slang.items()
+        if k != v and ' ' not in v and preprocessor.cleanse(k) == k
+    )
+    tokens, dependencies = preprocessor.preprocess_text_tracked(f"gacor {slang_word}")
+    assert {'gacor', slang_word, normalized} <= dependencies
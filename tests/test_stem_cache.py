@@ -0,0 +1,44 @@
+import json
+import os
+import pandas as pd
+import pytest
+from conftest import REPO_DIR
+from preprocessing import Preprocessor
+
+@pytest.fixture(scope='module')
+def validation_texts():
+    return pd.read_csv(os.path.join(REPO_DIR, 'data_validasi_mentah.csv'))['text'].tolist()
+
+def test_pooled_batch_fills_parent_stem_cache(validation_texts, tmp_path):
+    cache_path = tmp_path / 'stem_cache.json'
+    preprocessor = Preprocessor(stem_cache_path=str(cache_path))
+    pooled = preprocessor.preprocess_batch(validation_texts, workers=2, chunksize=400)
+    assert preprocessor.stem_cache_info()['size'] > 0
+
+    preprocessor.save_stem_cache()
+    with open(cache_path, encoding='utf-8') as f:
+        saved = json.load(f)
+    assert len(saved) == preprocessor.stem_cache_info()['size']
+
+    # Cache hasil worker harus cukup untuk mengulang batch yang sama tanpa memanggil Sastrawi
+    misses = preprocessor.stem_cache_info()['misses']
+    assert preprocessor.preprocess_batch(validation_texts, workers=1) == pooled
+    assert preprocessor.stem_cache_info()['misses'] == misses
+
+def test_submit_chunk_merges_stems(validation_texts):
+    preprocessor = Preprocessor()
+    with preprocessor.worker_pool(1) as executor:
+        tokens = preprocessor.collect_chunk(preprocessor.submit_chunk(executor, validation_texts[:200]))
+    assert tokens == [preprocessor.preprocess_text(text) for text in validation_texts[:200]]
+    assert preprocessor.stem_cache_info()['misses'] == 0
+    assert preprocessor.stem_cache_info()['size'] > 0
+
+def test_sastrawi_dictionary_keeps_library_api():
+    preprocessor = Preprocessor()
+    dictionary = preprocessor.stemmer.delegatedStemmer.dictionary
+    assert isinstance(dictionary.words, list)
+    assert dictionary.contains('makan')
+    dictionary.add('gacor')
+    assert dictionary.contains('gacor')
+    assert dictionary.count() == len(dictionary.words)
+    assert preprocessor.stem_word('memakan') == 'makan'
@@ -0,0 +1,30 @@
+import os
+from training import METRICS_TABLE_PATH, SCENARIOS, find_metrics_table, foreign_checkpoints
+
+def write_metrics(directory, mtime):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, METRICS_TABLE_PATH)
+    with open(path, 'w') as f:
+        f.write('Skenario,Accuracy\n')
+    os.utime(path, (mtime, mtime))
+    return path
+
+def test_metrics_table_from_newest_run(tmp_path):
+    runs_dir = tmp_path / 'hasil_training'
+    write_metrics(runs_dir / '20260101-000000', 1000)
+    newest = write_metrics(runs_dir / '20260102-000000', 2000)
+    os.makedirs(runs_dir / 'gagal')
+    assert find_metrics_table(str(tmp_path), str(runs_dir)) == newest
+
+def test_metrics_table_next_to_checkpoints_wins(tmp_path):
+    runs_dir = tmp_path / 'hasil_training'
+    write_metrics(runs_dir / '20260102-000000', 2000)
+    published = write_metrics(tmp_path, 1000)
+    assert find_metrics_table(str(tmp_path), str(runs_dir)) == published
+    assert find_metrics_table(str(tmp_path / 'kosong'), str(tmp_path / 'tidak_ada')) is None
+
+def test_foreign_checkpoints(tmp_path):
+    (tmp_path / 'model 1.h5').write_bytes(b'')
+    (tmp_path / 'model 2.h5').write_bytes(b'')
+    assert foreign_checkpoints(str(tmp_path), SCENARIOS[:1]) == ['model 2.h5']
+    assert foreign_checkpoints(str(tmp_path), SCENARIOS) == []
@@ -0,0 +1,73 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import REPO_DIR
+from word_embedding import VocabularyIndex
+
+tf = pytest.importorskip('tensorflow')
+
+CSV_FILES = ['data_validasi_mentah.csv', 'dataset_judol_BALANCED_19k.csv']
+MAX_LENGTH = 50
+
+def keras_encode(tokenizer, texts, max_length=MAX_LENGTH):
+    sequences = tokenizer.texts_to_sequences(texts)
+    return tf.keras.preprocessing.sequence.pad_sequences(
+        sequences, maxlen=max_length, padding='post', truncating='post'
+    )
+
+@pytest.fixture(scope='module')
+def tokenizer_json():
+    with open(os.path.join(REPO_DIR, 'tokenizer.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+@pytest.fixture(scope='module')
+def keras_tokenizer(tokenizer_json):
+    return tf.keras.preprocessing.text.tokenizer_from_json(tokenizer_json)
+
+@pytest.fixture(scope='module')
+def vocab(tokenizer_json):
+    return VocabularyIndex.from_keras_json(tokenizer_json)
+
+@pytest.fixture(scope='module')
+def preprocessor():
+    from preprocessing import Preprocessor
+    return Preprocessor()
+
+@pytest.mark.parametrize('filename', CSV_FILES)
+def test_encode_matches_keras_on_csv(preprocessor, keras_tokenizer, vocab, filename):
+    texts = pd.read_csv(os.path.join(REPO_DIR, filename))['text']
+    processed = [" ".join(tokens) for tokens in preprocessor.preprocess_batch(texts, workers=1)]
+    np.testing.assert_array_equal(vocab.encode(processed, MAX_LENGTH), keras_encode(keras_tokenizer, processed))
+
+@pytest.mark.parametrize('filename', CSV_FILES)
+def test_encode_matches_keras_on_raw_csv(keras_tokenizer, vocab, filename):
+    # Teks mentah (tanda baca, huruf besar, > 50 token) menguji filters, lower dan truncating 'post'
+    texts = pd.read_csv(os.path.join(REPO_DIR, filename))['text'].astype(str).tolist()
+    np.testing.assert_array_equal(vocab.encode(texts, MAX_LENGTH), keras_encode(keras_tokenizer, texts))
+
+def test_encode_token_lists(keras_tokenizer, vocab):
+    token_lists = [['Judi', 'online', 'GACOR'], [], ['kata_tidak_dikenal', 'slot'] * 40]
+    np.testing.assert_array_equal(
+        vocab.encode(token_lists, MAX_LENGTH), keras_encode(keras_tokenizer, token_lists)
+    )
+
+@pytest.mark.parametrize('oov_token', ['<OOV>', None])
+def test_num_words_boundary(oov_token):
+    tokenizer = tf.keras.preprocessing.text.Tokenizer(num_words=5, oov_token=oov_token)
+    tokenizer.fit_on_texts(["a a a a a b b b b c c c d d e", "f g"])
+    vocab = VocabularyIndex.from_keras_json(tokenizer.to_json())
+    # Indeks num_words - 1 masih dipakai; indeks >= num_words menjadi OOV (atau dibuang tanpa oov_token)
+    texts = ["a b c d e f g", "e f g", "zzz a", ""]
+    np.testing.assert_array_equal(vocab.encode(texts, 4), keras_encode(tokenizer, texts, 4))
+
+def test_slim_round_trip(vocab, tmp_path):
+    slim_path = str(tmp_path / 'tokenizer.npz')
+    vocab.save_slim(slim_path)
+    loaded = VocabularyIndex.from_slim(slim_path)
+    assert loaded.word_to_id == vocab.word_to_id
+    assert (loaded.num_words, loaded.oov_token, loaded.oov_id, loaded.filters, loaded.lower, loaded.split) == \
+        (vocab.num_words, vocab.oov_token, vocab.oov_id, vocab.filters, vocab.lower, vocab.split)
+    texts = ["judi online gacor maxwin", "Kata Tak Dikenal!", ""]
+    np.testing.assert_array_equal(loaded.encode(texts, MAX_LENGTH), vocab.encode(texts, MAX_LENGTH))
@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import numpy as np
+
+QUANTIZATIONS = ('float16', 'int8')
+
+def tflite_path(model_path, quantization):
+    # "model 6.h5" -> "model 6.float16.tflite"
+    return f"{os.path.splitext(model_path)[0]}.{quantization}.tflite"
+
+def _unrolled_clone(model):
+    import tensorflow as tf
+    # LSTM di-unroll (panjang input tetap max_length) agar hasil konversi hanya memakai op bawaan TFLite
+    # dan dimensi batch tetap dinamis; tanpa unroll konverter membutuhkan Flex op (TensorList*)
+    def clone_layer(layer):
+        config = layer.get_config()
+        if isinstance(layer, tf.keras.layers.RNN) or 'unroll' in config:
+            config['unroll'] = True
+        return layer.__class__.from_config(config)
+
+    clone = tf.keras.models.clone_model(model, clone_function=clone_layer)
+    clone.set_weights(model.get_weights())
+    return clone
+
+def export_tflite(model_path, quantization='float16', output_path=None):
+    import tensorflow as tf
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Kuantisasi tidak dikenal: {quantization} (pilih {', '.join(QUANTIZATIONS)})")
+    output_path = output_path or tflite_path(model_path, quantization)
+
+    model = tf.keras.models.load_model(model_path, compile=False)
+    converter = tf.lite.TFLiteConverter.from_keras_model(_unrolled_clone(model))
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    # 'int8' = dynamic-range: bobot int8, aktivasi tetap float (tidak butuh dataset representatif)
+    tflite_bytes = converter.convert()
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(tflite_bytes)
+    os.replace(tmp_path, output_path)
+    print(f"{model_path} -> {output_path} ({os.path.getsize(model_path) / 1024:.0f} KB -> {len(tflite_bytes) / 1024:.0f} KB)")
+    return output_path
+
+def accuracy_delta(reference_scores, scores, labels=None):
+    reference_scores = np.asarray(reference_scores, dtype=float).ravel()
+    scores = np.asarray(scores, dtype=float).ravel()
+    diff = np.abs(reference_scores - scores)
+    reference_preds = reference_scores >= 0.5
+    preds = scores >= 0.5
+    report = {
+        'n': int(len(scores)),
+        'mean_abs_diff': float(diff.mean()) if len(diff) else 0.0,
+        'max_abs_diff': float(diff.max()) if len(diff) else 0.0,
+        'prediction_agreement': float((reference_preds == preds).mean()) if len(preds) else 1.0,
+    }
+    if labels is not None:
+        labels = np.asarray(labels).astype(int).astype(bool)
+        report['accuracy_reference'] = float((reference_preds == labels).mean())
+        report['accuracy'] = float((preds == labels).mean())
+        report['accuracy_delta'] = report['accuracy'] - report['accuracy_reference']
+    return report
+
+def validation_report(model_path, exported_paths, validation_path='data_validasi_mentah.csv',
+                      tokenizer_path='tokenizer.json', tflite_threads=None):
+    import pandas as pd
+    from preprocessing import Preprocessor
+    from word_embedding import WordEmbedding
+    from model_builder import ModelBuilder
+
+    df = pd.read_csv(validation_path)
+    preprocessor = Preprocessor()
+    word_embedding = WordEmbedding()
+    word_embedding.load_tokenizer(tokenizer_path)
+    processed = [" ".join(tokens) for tokens in preprocessor.preprocess_batch(df['text'])]
+    sequences = word_embedding.get_sequences(processed)
+    labels = df['label'].to_numpy() if 'label' in df.columns else None
+
+    builder = ModelBuilder(preprocessor, word_embedding, tflite_threads=tflite_threads)
+    if not builder.load_model(model_path):
+        raise RuntimeError(f"Gagal memuat model {model_path}")
+    reference_scores = builder.classify_sequences(sequences)
+
+    reports = {}
+    for path in exported_paths:
+        if not builder.load_model(path):
+            raise RuntimeError(f"Gagal memuat model {path}")
+        reports[path] = dict(
+            accuracy_delta(reference_scores, builder.classify_sequences(sequences), labels),
+            size_bytes=os.path.getsize(path),
+            reference_size_bytes=os.path.getsize(model_path),
+        )
+        r = reports[path]
+        print(f"{path}: selisih skor rata-rata {r['mean_abs_diff']:.6f} | maks {r['max_abs_diff']:.6f} | "
+              f"prediksi sama {r['prediction_agreement'] * 100:.2f}%"
+              + (f" | akurasi {r['accuracy_reference']:.4f} -> {r['accuracy']:.4f}" if labels is not None else ""))
+    return reports
+
+def main():
+    parser = argparse.ArgumentParser(description="Ekspor model LSTM .h5 ke TFLite (float16 / int8 dynamic-range)")
+    parser.add_argument('models', nargs='+', help="Path model .h5 (boleh lebih dari satu)")
+    parser.add_argument('--quantization', choices=QUANTIZATIONS + ('all',), default='all')
+    parser.add_argument('--report', help="Hitung selisih akurasi pada data validasi dan simpan ke file JSON")
+    parser.add_argument('--validation', default='data_validasi_mentah.csv')
+    parser.add_argument('--tokenizer', default='tokenizer.json')
+    parser.add_argument('--threads', type=int, help="Jumlah thread interpreter TFLite untuk --report")
+    args = parser.parse_args()
+
+    quantizations = QUANTIZATIONS if args.quantization == 'all' else (args.quantization,)
+    reports = {}
+    for model_path in args.models:
+        exported = [export_tflite(model_path, q) for q in quantizations]
+        if args.report:
+            reports[model_path] = validation_report(
+                model_path, exported, args.validation, args.tokenizer, args.threads
+            )
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+        print(f"Laporan akurasi disimpan ke {args.report}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from artifact_cache import artifact_path, file_hash, hash_key, load_arrays, save_arrays
+
+TRAINING_DATA_PATH = 'dataset_judol_BALANCED_19k.csv'
+METRICS_TABLE_PATH = 'training_metrics.csv'
+TRAINING_RUNS_DIR = 'hasil_training'
+SPLIT_SEED = 42
+
+# Sama dengan scenarios_config di notebook; nama file mengikuti DATA_SKENARIO di app.py
+SCENARIOS = [
+    {'name': 'model 1.h5',  'lr': 0.001,  'bs': 32, 'epoch': 5},
+    {'name': 'model 2.h5',  'lr': 0.001,  'bs': 32, 'epoch': 10},
+    {'name': 'model 3.h5',  'lr': 0.001,  'bs': 32, 'epoch': 25},
+    {'name': 'model 4.h5',  'lr': 0.001,  'bs': 64, 'epoch': 5},
+    {'name': 'model 5.h5',  'lr': 0.001,  'bs': 64, 'epoch': 10},
+    {'name': 'model 6.h5',  'lr': 0.001,  'bs': 64, 'epoch': 25},
+    {'name': 'model 7.h5',  'lr': 0.0001, 'bs': 32, 'epoch': 5},
+    {'name': 'model 8.h5',  'lr': 0.0001, 'bs': 32, 'epoch': 10},
+    {'name': 'model 9.h5',  'lr': 0.0001, 'bs': 32, 'epoch': 25},
+    {'name': 'model 10.h5', 'lr': 0.0001, 'bs': 64, 'epoch': 5},
+    {'name': 'model 11.h5', 'lr': 0.0001, 'bs': 64, 'epoch': 10},
+    {'name': 'model 12.h5', 'lr': 0.0001, 'bs': 64, 'epoch': 25},
+]
+
+def prepare_data(dataset_path=TRAINING_DATA_PATH, tokenizer_path='tokenizer.json', workers=None):
+    # Preprocessing, Word2Vec, tokenizer dan sequence dibuat sekali lalu disimpan sebagai artefak .npz
+    # (kunci: hash dataset + kamus/stopword + konfigurasi), sehingga semua skenario memakai array yang sama
+    from preprocessing import Preprocessor
+    from word_embedding import VocabularyIndex, WordEmbedding
+
+    preprocessor = Preprocessor()
+    config = WordEmbedding().config
+    key = hash_key(file_hash(dataset_path), preprocessor.fingerprint(), json.dumps(config, sort_keys=True), SPLIT_SEED)
+    data = load_arrays('training_data', key)
+    if data is None:
+        from sklearn.model_selection import train_test_split
+        from gensim.models import Word2Vec
+        import tensorflow as tf
+
+        df_raw = pd.read_csv(dataset_path).dropna(subset=['text'])
+        print(f"Data mentah berhasil dimuat. Total baris: {len(df_raw)}")
+        # Pembagian 72% train / 8% val / 20% test, sama seperti notebook
+        train_val_raw, test_raw = train_test_split(
+            df_raw, test_size=0.20, random_state=SPLIT_SEED, stratify=df_raw['label']
+        )
+        train_raw, val_raw = train_test_split(
+            train_val_raw, test_size=0.10, random_state=SPLIT_SEED, stratify=train_val_raw['label']
+        )
+        print(f"Data mentah: Train ({len(train_raw)}), Val ({len(val_raw)}), Test ({len(test_raw)})")
+
+        splits = {'train': train_raw, 'val': val_raw, 'test': test_raw}
+        tokens = {name: preprocessor.preprocess_batch(split['text'], workers=workers) for name, split in splits.items()}
+
+        print("Melatih model Word2Vec (Skip-gram) pada data train...")
+        word2vec_model = Word2Vec(
+            sentences=tokens['train'], vector_size=config['embedding_dim'],
+            window=10, min_count=3, sg=1, workers=os.cpu_count(), seed=SPLIT_SEED
+        )
+        tokenizer = tf.keras.preprocessing.text.Tokenizer(num_words=config['vocab_size'], oov_token="<OOV>")
+        tokenizer.fit_on_texts([' '.join(t) for t in tokens['train']])
+        tokenizer_json = tokenizer.to_json()
+        vocab = VocabularyIndex.from_keras_json(tokenizer_json)
+
+        rng = np.random.default_rng(SPLIT_SEED)
+        embedding_matrix = np.zeros((config['vocab_size'], config['embedding_dim']), dtype=np.float32)
+        for word, i in tokenizer.word_index.items():
+            if i >= config['vocab_size']:
+                continue
+            if word in word2vec_model.wv:
+                embedding_matrix[i] = word2vec_model.wv[word]
+            else:
+                # Kata yang tidak ada di Word2Vec diisi random
+                embedding_matrix[i] = rng.normal(scale=0.6, size=(config['embedding_dim'],))
+
+        data = {'embedding_matrix': embedding_matrix, 'tokenizer_json': np.array(tokenizer_json)}
+        for name, split in splits.items():
+            data[f'x_{name}'] = vocab.encode([' '.join(t) for t in tokens[name]], config['max_length'])
+            data[f'y_{name}'] = split['label'].to_numpy(dtype=np.int32)
+        save_arrays('training_data', key, **data)
+
+    with open(tokenizer_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(str(data['tokenizer_json']), ensure_ascii=False))
+    print(f"Tokenizer disimpan ke {tokenizer_path}")
+    return artifact_path('training_data', key)
+
+def _make_dataset(x, y, batch_size, shuffle=False):
+    import tensorflow as tf
+    dataset = tf.data.Dataset.from_tensor_slices((x, y))
+    if shuffle:
+        dataset = dataset.shuffle(len(x), seed=SPLIT_SEED, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+def train_scenario(scenario, data_path, output_dir, threads_per_job=1):
+    # Dijalankan di proses worker: batas thread TensorFlow harus diset sebelum operasi pertama
+    import tensorflow as tf
+    from sklearn.metrics import classification_report
+    tf.config.threading.set_intra_op_parallelism_threads(threads_per_job)
+    tf.config.threading.set_inter_op_parallelism_threads(threads_per_job)
+    tf.keras.utils.set_random_seed(SPLIT_SEED)
+
+    with np.load(data_path, allow_pickle=False) as data:
+        data = {k: data[k] for k in data.files}
+    embedding_matrix = data['embedding_matrix']
+    vocab_size, embedding_dim = embedding_matrix.shape
+
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(data['x_train'].shape[1],)),
+        tf.keras.layers.Embedding(
+            vocab_size, embedding_dim,
+            embeddings_initializer=tf.keras.initializers.Constant(embedding_matrix),
+            trainable=False
+        ),
+        tf.keras.layers.LSTM(64, dropout=0.2, return_sequences=False),
+        tf.keras.layers.Dense(32, activation='relu'),
+        tf.keras.layers.Dense(1, activation='sigmoid')
+    ])
+    model.compile(
+        loss='binary_crossentropy',
+        optimizer=tf.keras.optimizers.Adam(learning_rate=scenario['lr']),
+        metrics=['accuracy']
+    )
+
+    t_start = time.perf_counter()
+    history = model.fit(
+        _make_dataset(data['x_train'], data['y_train'], scenario['bs'], shuffle=True),
+        epochs=scenario['epoch'],
+        validation_data=_make_dataset(data['x_val'], data['y_val'], 256),
+        verbose=0
+    )
+    train_time = time.perf_counter() - t_start
+
+    model_path = os.path.join(output_dir, scenario['name'])
+    model.save(model_path)
+
+    y_pred = (model.predict(_make_dataset(data['x_test'], data['y_test'], 256), verbose=0) > 0.5).astype(int).ravel()
+    report = classification_report(data['y_test'], y_pred, output_dict=True, zero_division=0)
+    return {
+        'Skenario': scenario['name'],
+        'LR': scenario['lr'],
+        'Batch': scenario['bs'],
+        'Epoch': scenario['epoch'],
+        'Accuracy': report['accuracy'],
+        'Precision': report['macro avg']['precision'],
+        'Recall': report['macro avg']['recall'],
+        'F1-Score': report['macro avg']['f1-score'],
+        'Val Accuracy': history.history['val_accuracy'][-1],
+        'Waktu Latih (s)': train_time,
+    }
+
+def run_grid(scenarios, data_path, output_dir='.', workers=None, threads_per_job=1):
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or max(1, (os.cpu_count() or 1) // threads_per_job)
+    # Skenario terlama (epoch x langkah per epoch) dijadwalkan lebih dulu agar pool tidak menunggu satu job panjang di akhir
+    ordered = sorted(scenarios, key=lambda s: s['epoch'] / s['bs'], reverse=True)
+    print(f"--- MEMULAI TRAINING {len(ordered)} SKENARIO ({workers} proses x {threads_per_job} thread) ---")
+
+    rows = []
+    t_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {
+            executor.submit(train_scenario, scenario, data_path, output_dir, threads_per_job): scenario
+            for scenario in ordered
+        }
+        for future in as_completed(futures):
+            scenario = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                print(f"ERROR: Training {scenario['name']} gagal: {e}")
+                continue
+            rows.append(row)
+            print(f"   [SELESAI] {row['Skenario']}: akurasi {row['Accuracy']:.4f} | F1 {row['F1-Score']:.4f} "
+                  f"| {row['Waktu Latih (s)']:.1f} detik")
+    print(f"=== SEMUA TRAINING SELESAI dalam {(time.perf_counter() - t_start) / 60:.2f} menit ===")
+
+    if not rows:
+        return None
+    df_summary = pd.DataFrame(rows).sort_values(by='F1-Score', ascending=False)
+    metrics_path = os.path.join(output_dir, METRICS_TABLE_PATH)
+    df_summary.to_csv(metrics_path, index=False)
+    print(f"Tabel metrik disimpan ke {metrics_path}")
+    return df_summary
+
+def load_metrics_table(path=METRICS_TABLE_PATH):
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_csv(path)
+    except Exception as e:
+        print(f"ERROR: Gagal membaca tabel metrik {path}: {e}")
+        return None
+
+def find_metrics_table(model_dir='.', runs_dir=TRAINING_RUNS_DIR):
+    # Tabel di samping checkpoint yang dipakai aplikasi diutamakan; jika tidak ada, tabel dari run
+    # training terbaru di runs_dir (folder default --output-dir)
+    metrics_path = os.path.join(model_dir, METRICS_TABLE_PATH)
+    if os.path.exists(metrics_path):
+        return metrics_path
+    if not os.path.isdir(runs_dir):
+        return None
+    candidates = [os.path.join(runs_dir, name, METRICS_TABLE_PATH) for name in os.listdir(runs_dir)]
+    candidates = [path for path in candidates if os.path.exists(path)]
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+def foreign_checkpoints(output_dir, scenarios):
+    # Checkpoint skenario lain yang sudah ada di output_dir: tokenizer.json baru tidak cocok dengan model-model ini
+    selected = {scenario['name'] for scenario in scenarios}
+    return [
+        scenario['name'] for scenario in SCENARIOS
+        if scenario['name'] not in selected and os.path.exists(os.path.join(output_dir, scenario['name']))
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Training paralel 12 skenario model LSTM")
+    parser.add_argument('--dataset', default=TRAINING_DATA_PATH)
+    parser.add_argument(
+        '--output-dir', default=os.path.join(TRAINING_RUNS_DIR, time.strftime('%Y%m%d-%H%M%S')),
+        help=f"Folder checkpoint .h5, tokenizer.json dan tabel metrik (default: folder baru {TRAINING_RUNS_DIR}/<waktu>)"
+    )
+    parser.add_argument('--scenarios', type=int, nargs='*', help="Nomor skenario (1-12), default semua")
+    parser.add_argument('--workers', type=int, help="Jumlah proses training paralel (default: CPU / threads-per-job)")
+    parser.add_argument('--threads-per-job', type=int, default=1)
+    parser.add_argument('--preprocess-workers', type=int, help="Jumlah proses untuk preprocessing dataset")
+    args = parser.parse_args()
+
+    scenarios = SCENARIOS if not args.scenarios else [SCENARIOS[i - 1] for i in args.scenarios]
+    foreign = foreign_checkpoints(args.output_dir, scenarios)
+    if foreign:
+        # Menimpa tokenizer.json di sini membuat checkpoint lain memakai vocabulary yang salah
+        print(f"ERROR: {args.output_dir} berisi checkpoint di luar skenario yang dipilih ({', '.join(foreign)}); "
+              f"gunakan --output-dir lain atau latih ulang semua skenario tersebut.")
+        raise SystemExit(1)
+    os.makedirs(args.output_dir, exist_ok=True)
+    data_path = prepare_data(
+        args.dataset, os.path.join(args.output_dir, 'tokenizer.json'), workers=args.preprocess_workers
+    )
+    df_summary = run_grid(scenarios, data_path, args.output_dir, args.workers, args.threads_per_job)
+    if df_summary is not None and os.path.abspath(args.output_dir) != os.path.abspath('.'):
+        # Aplikasi membaca tabel metrik run terbaru dari hasil_training/, tetapi tetap memakai checkpoint dan
+        # tokenizer.json di folder aplikasi sampai hasil training disalin ke sana
+        if len(df_summary) == len(SCENARIOS):
+            print(f"Untuk memakai model baru di aplikasi, salin semua 'model N.h5', 'tokenizer.json' dan "
+                  f"'{METRICS_TABLE_PATH}' dari {args.output_dir} ke folder aplikasi.")
+        else:
+            print(f"tokenizer.json di {args.output_dir} hanya cocok dengan checkpoint di folder tersebut; untuk "
+                  f"mengganti model aplikasi, latih semua skenario lalu salin hasilnya ke folder aplikasi.")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,106 @@
 import numpy as np
 import json
-import tensorflow as tf
-from tensorflow.keras.preprocessing.sequence import pad_sequences
+from artifact_cache import file_hash, hash_key
+from instrumentation import profiler
+
+class VocabularyIndex:
+    # Pengganti Tokenizer.texts_to_sequences + pad_sequences (padding & truncating 'post')
+    # dengan semantik num_words/OOV yang sama, tanpa melewati Keras
+    def __init__(self, word_index, num_words=None, oov_token=None, filters='', lower=True, split=' '):
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self.oov_id = word_index.get(oov_token) if oov_token is not None else None
+        self.filters = filters
+        self.lower = lower
+        self.split = split
+        self.translate_map = str.maketrans({c: split for c in filters})
+        # Kata dengan indeks >= num_words diperlakukan seperti kata yang tidak dikenal
+        self.word_to_id = {
+            word: idx for word, idx in word_index.items()
+            if not num_words or idx < num_words
+        }
+
+    @classmethod
+    def from_keras_json(cls, tokenizer_json):
+        tokenizer_config = json.loads(tokenizer_json)['config']
+        return cls(
+            json.loads(tokenizer_config['word_index']),
+            num_words=tokenizer_config.get('num_words'),
+            oov_token=tokenizer_config.get('oov_token'),
+            filters=tokenizer_config.get('filters', ''),
+            lower=tokenizer_config.get('lower', True),
+            split=tokenizer_config.get('split', ' ')
+        )
+
+    @classmethod
+    def from_slim(cls, filepath):
+        with np.load(filepath, allow_pickle=False) as data:
+            tokenizer_config = json.loads(str(data['config']))
+            words = data['words'].tobytes().decode('utf-8').split('\n')
+            word_index = dict(zip(words, data['ids'].tolist()))
+        return cls(word_index, **tokenizer_config)
+
+    def save_slim(self, filepath):
+        # Format ringkas: hanya word_index di bawah num_words + konfigurasi tokenizer
+        tokenizer_config = {
+            'num_words': self.num_words,
+            'oov_token': self.oov_token,
+            'filters': self.filters,
+            'lower': self.lower,
+            'split': self.split
+        }
+        with open(filepath, 'wb') as f:
+            np.savez(
+                f,
+                # Kata disimpan sebagai satu blob UTF-8 dipisah newline (newline selalu ada di filters)
+                words=np.frombuffer('\n'.join(self.word_to_id.keys()).encode('utf-8'), dtype=np.uint8),
+                ids=np.array(list(self.word_to_id.values()), dtype=np.int32),
+                config=np.array(json.dumps(tokenizer_config))
+            )
+
+    def to_keras_tokenizer(self):
+        import tensorflow as tf
+        tokenizer = tf.keras.preprocessing.text.Tokenizer(
+            num_words=self.num_words,
+            filters=self.filters,
+            lower=self.lower,
+            split=self.split,
+            oov_token=self.oov_token
+        )
+        tokenizer.word_index = dict(self.word_to_id)
+        tokenizer.index_word = {idx: word for word, idx in self.word_to_id.items()}
+        return tokenizer
+
+    def split_text(self, text):
+        if self.lower:
+            text = text.lower()
+        return [word for word in text.translate(self.translate_map).split(self.split) if word]
+
+    def encode(self, texts, max_length, out=None):
+        n = len(texts)
+        if out is None:
+            out = np.zeros((n, max_length), dtype=np.int32)
+        else:
+            out = out[:n]
+            out.fill(0)
+        word_to_id = self.word_to_id
+        oov_id = self.oov_id
+        for row, text in enumerate(texts):
+            words = self.split_text(text) if isinstance(text, str) else [w.lower() if self.lower else w for w in text]
+            ids = [word_to_id.get(word, oov_id) for word in words]
+            if oov_id is None:
+                ids = [idx for idx in ids if idx is not None]
+            ids = ids[:max_length]
+            if ids:
+                out[row, :len(ids)] = ids
+        return out
+
+def convert_tokenizer(json_path='tokenizer.json', slim_path='tokenizer.npz'):
+    with open(json_path, 'r', encoding='utf-8') as f:
+        vocab = VocabularyIndex.from_keras_json(json.load(f))
+    vocab.save_slim(slim_path)
+    print(f"Tokenizer ringkas disimpan ke {slim_path} ({len(vocab.word_to_id)} kata)")
+    return slim_path
 
 class WordEmbedding:
     def __init__(self):
@@ -10,28 +109,46 @@ class WordEmbedding:
             'embedding_dim': 300,
             'vocab_size': 10000
         }
-        self.tokenizer = None 
+        self.tokenizer_path = None
+        self.vocab = None
+        self._keras_tokenizer = None
         print("WordEmbedding (Offline) siap.")
 
+    @property
+    def tokenizer(self):
+        # Tokenizer Keras hanya dibuat jika benar-benar diminta (memerlukan import TensorFlow)
+        if self._keras_tokenizer is None and self.vocab is not None:
+            self._keras_tokenizer = self.vocab.to_keras_tokenizer()
+        return self._keras_tokenizer
+
     def load_tokenizer(self, filepath='tokenizer.json'):
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                tokenizer_data = json.load(f)
-                # Keras memuat dari string json, bukan dari file
-                self.tokenizer = tf.keras.preprocessing.text.tokenizer_from_json(tokenizer_data)
+            if filepath.endswith('.npz'):
+                self.vocab = VocabularyIndex.from_slim(filepath)
+            else:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    # tokenizer.json berisi string json (hasil tokenizer.to_json()), bukan objek
+                    self.vocab = VocabularyIndex.from_keras_json(json.load(f))
+            self._keras_tokenizer = None
+            self.tokenizer_path = filepath
             print(f"Tokenizer berhasil dimuat dari {filepath}")
         except Exception as e:
             print(f"ERROR: Gagal memuat tokenizer dari {filepath}: {e}")
             raise e 
 
-    def get_sequences(self, texts_as_strings):
-        if self.tokenizer is None:
+    def fingerprint(self):
+        if self.tokenizer_path is None:
             raise ValueError("Tokenizer belum dimuat. Panggil load_tokenizer() dulu.")
-            
-        seq = self.tokenizer.texts_to_sequences(texts_as_strings)
-        return pad_sequences(
-            seq, 
-            maxlen=self.config['max_length'], 
-            padding='post', 
-            truncating='post'
-        )
\ No newline at end of file
+        return hash_key(file_hash(self.tokenizer_path), self.config['max_length'])
+
+    def get_sequences(self, texts_as_strings, out=None):
+        if self.vocab is None:
+            raise ValueError("Tokenizer belum dimuat. Panggil load_tokenizer() dulu.")
+
+        texts = list(texts_as_strings)
+        with profiler.stage('word_embedding.get_sequences', items=len(texts)):
+            return self.vocab.encode(texts, self.config['max_length'], out=out)
+
+if __name__ == "__main__":
+    import sys
+    convert_tokenizer(*sys.argv[1:3])